@@ -2,6 +2,7 @@ const express = require('express');
 const { createProxyMiddleware } = require('http-proxy-middleware');
 const cors = require('cors');
 const jwt = require('jsonwebtoken');
+const crypto = require('crypto');
 
 const app = express();
 const PORT = process.env.PORT || 3000;
@@ -16,6 +17,14 @@ app.use(cors({
 }));
 app.use(express.json());
 
+// First hop of every trace: reuse the caller's X-Request-ID or mint one, then forward it
+app.use((req, res, next) => {
+  const requestId = req.headers['x-request-id'] || crypto.randomBytes(16).toString('hex');
+  req.headers['x-request-id'] = requestId;
+  res.setHeader('X-Request-ID', requestId);
+  next();
+});
+
 const services = {
   userService: 'http://user-service:3001',
   restaurantService: 'http://restaurant-service:3002',
@@ -121,7 +130,8 @@ const createAuthProxy = (service) => {
         proxyReq.setHeader('X-User-Username', req.user.username);
       }
 
-      if ((req.method === 'POST' || req.method === 'PUT' || req.method === 'PATCH') && req.body) {
+      // Only re-send bodies express.json() parsed; other types (NDJSON/CSV imports) stream through untouched
+      if ((req.method === 'POST' || req.method === 'PUT' || req.method === 'PATCH') && req.body && req.is('application/json')) {
         let bodyData = JSON.stringify(req.body);
         proxyReq.setHeader('Content-Type', 'application/json');
         proxyReq.setHeader('Content-Length', Buffer.byteLength(bodyData));
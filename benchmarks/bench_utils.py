@@ -0,0 +1,23 @@
+from collections import Counter
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0.0 for an empty list)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_header(label_width=10, extra=''):
+    print(f"{'endpoint':<{label_width}} {extra}{'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status codes")
+
+
+def print_row(name, samples, elapsed, label_width=10, extra=''):
+    """samples is a list of (latency_seconds, status_code) tuples"""
+    latencies = [latency * 1000 for latency, _ in samples]
+    codes = dict(Counter(code for _, code in samples))
+    print(f"{name:<{label_width}} {extra}{len(samples):>9} {len(samples) / elapsed if elapsed else 0:>8.1f} "
+          f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f}  "
+          f"{codes}")
@@ -0,0 +1,143 @@
+"""
+Boot the user, restaurant, order and payment Flask apps in one process on SQLite.
+
+Every service ships top-level modules with the same names (app, models, config,
+http_client, ...), so each one is imported with its own directory on sys.path
+and then moved out of sys.modules before the next service is loaded. Calls made
+through a service's http_client are routed by WSGIAdapter straight into the
+target app, so the whole order flow runs without Docker, MySQL or sockets.
+"""
+import importlib
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SERVICES = {
+    'user-service': 'http://user-service:3001',
+    'restaurant-service': 'http://restaurant-service:3002',
+    'order-service': 'http://order-service:3003',
+    'payment-service': 'http://payment-service:3004',
+}
+
+
+class WSGIAdapter(BaseAdapter):
+    """requests transport adapter that dispatches to in-process Flask apps by host:port"""
+
+    def __init__(self, apps):
+        super().__init__()
+        self.apps = apps
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        app = self.apps.get(url.netloc)
+        if app is None:
+            raise requests.exceptions.ConnectionError(f'No in-process service for {url.netloc}', request=request)
+
+        result = app.test_client().open(
+            path=url.path,
+            query_string=url.query,
+            method=request.method,
+            headers=dict(request.headers),
+            data=request.body
+        )
+
+        response = requests.Response()
+        response.status_code = result.status_code
+        response.headers = CaseInsensitiveDict(result.headers)
+        response._content = result.get_data()
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def _environ(overrides):
+    """Apply environment overrides for the duration of the block, then restore the previous values"""
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def load_service(name, database_url, env=None, extra_modules=()):
+    """
+    Import one service's app module (plus extra_modules, e.g. its workers) in
+    isolation and return {module_name: module}.
+
+    Config is read at import time, so env only applies while the service is
+    imported and does not leak into services or tests loaded afterwards.
+    """
+    service_dir = str(ROOT / name)
+    overrides = {
+        'DATABASE_URL': database_url,
+        'SERVICE_NAME': name,
+        'USER_SERVICE_URL': SERVICES['user-service'],
+        'RESTAURANT_SERVICE_URL': SERVICES['restaurant-service'],
+        'ORDER_SERVICE_URL': SERVICES['order-service'],
+        'PAYMENT_SERVICE_URL': SERVICES['payment-service'],
+        **(env or {})
+    }
+
+    before = set(sys.modules)
+    sys.path.insert(0, service_dir)
+    try:
+        with _environ(overrides):
+            for module in ('app', 'migrations', *extra_modules):
+                importlib.import_module(module)
+    finally:
+        sys.path.remove(service_dir)
+        loaded = {
+            mod_name: sys.modules.pop(mod_name)
+            for mod_name in set(sys.modules) - before
+            if (getattr(sys.modules[mod_name], '__file__', None) or '').startswith(service_dir)
+        }
+    return loaded
+
+
+class Cluster:
+    """All four services loaded side by side, wired together through WSGIAdapter"""
+
+    def __init__(self, workdir, env=None):
+        self.modules = {}
+        for name in SERVICES:
+            db_path = Path(workdir) / f"{name.replace('-', '_')}.db"
+            # timeout= is the SQLite busy timeout, needed once several threads write at once
+            self.modules[name] = load_service(name, f'sqlite:///{db_path}?timeout=30', env)
+
+        adapter = WSGIAdapter({
+            urlsplit(url).netloc: self.modules[name]['app'].app for name, url in SERVICES.items()
+        })
+        for mods in self.modules.values():
+            if 'http_client' in mods:
+                mods['http_client'].service_client.mount('http://', adapter)
+            if 'health' in mods:
+                mods['health'].probe_client.mount('http://', adapter)
+
+        for name in SERVICES:
+            self.modules[name]['migrations'].run_migrations(self.app(name))
+
+    def app(self, name):
+        return self.modules[name]['app'].app
+
+    def models(self, name):
+        return self.modules[name]['models']
+
+    def client(self, name):
+        return self.app(name).test_client()
@@ -0,0 +1,67 @@
+"""
+Mixed login + balance-update load against a running User Service.
+
+Login threads hammer POST /auth/login (bcrypt-bound) while balance threads
+send credit/debit pairs to PUT /internal/users/<id>/balance. The interesting
+number is the balance-update latency: it should stay low during a login storm.
+
+Usage:
+    python benchmarks/login_balance_mix.py --url http://localhost:3001 \
+        --login-threads 16 --balance-threads 4 --duration 20
+"""
+import argparse
+import threading
+import time
+from collections import defaultdict
+import requests
+from bench_utils import print_header, print_row
+
+
+def login_worker(args, deadline, results):
+    session = requests.Session()
+    payload = {'username': args.username, 'password': args.password}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        res = session.post(f'{args.url}/auth/login', json=payload, timeout=30)
+        results['login'].append((time.perf_counter() - start, res.status_code))
+
+
+def balance_worker(args, deadline, results):
+    session = requests.Session()
+    url = f'{args.url}/internal/users/{args.user_id}/balance'
+    kinds = ['credit', 'debit']
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        res = session.put(url, json={'type': kinds[i % 2], 'amount': 1}, timeout=30)
+        results['balance'].append((time.perf_counter() - start, res.status_code))
+        i += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:3001')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--balance-threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    results = defaultdict(list)
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=login_worker, args=(args, deadline, results)) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=balance_worker, args=(args, deadline, results)) for _ in range(args.balance_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print_header()
+    for name in ('login', 'balance'):
+        print_row(name, results[name], args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+In-process load test of the order flow across all four services.
+
+Boots user, restaurant, order and payment services in one process on SQLite
+(see harness.py), seeds users and a menu, then drives each workload at every
+concurrency level and prints throughput plus p50/p95/p99 latency.
+
+Usage:
+    python benchmarks/order_flow.py --concurrency 1,4,16 --requests 400
+    python benchmarks/order_flow.py --workloads create_order --cart-size 10
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from harness import Cluster
+from bench_utils import print_header, print_row
+
+PASSWORD = 'bench-password'
+
+
+def seed(cluster, users, menu_items):
+    user_models = cluster.models('user-service')
+    with cluster.app('user-service').app_context():
+        password_hash = None
+        for i in range(users):
+            user = user_models.User(username=f'bench-user-{i}', name=f'Bench User {i}', balance=1e12)
+            if password_hash is None:
+                user.set_password(PASSWORD)
+                password_hash = user.password_hash
+            user.password_hash = password_hash
+            user_models.db.session.add(user)
+        user_models.db.session.commit()
+        user_ids = [u.id for u in user_models.User.query.all()]
+
+    restaurant_models = cluster.models('restaurant-service')
+    with cluster.app('restaurant-service').app_context():
+        restaurant = restaurant_models.Restaurant(name='Bench Kitchen', address='1 Bench St')
+        restaurant_models.db.session.add(restaurant)
+        restaurant_models.db.session.flush()
+        for i in range(menu_items):
+            restaurant_models.db.session.add(restaurant_models.MenuItem(
+                restaurant_id=restaurant.id, name=f'Item {i}', price=round(random.uniform(1, 30), 2)))
+        restaurant_models.db.session.commit()
+        menu_ids = [m.id for m in restaurant_models.MenuItem.query.all()]
+        restaurant_id = restaurant.id
+
+    return user_ids, restaurant_id, menu_ids
+
+
+def make_workloads(cluster, args, user_ids, restaurant_id, menu_ids):
+    order_app = cluster.app('order-service')
+    user_app = cluster.app('user-service')
+
+    def create_order():
+        items = [{'menu_item_id': item_id, 'quantity': random.randint(1, 3)}
+                 for item_id in random.sample(menu_ids, min(args.cart_size, len(menu_ids)))]
+        return order_app.test_client().post('/orders/', json={
+            'user_id': random.choice(user_ids),
+            'restaurant_id': restaurant_id,
+            'items': items
+        }).status_code
+
+    def list_orders():
+        return order_app.test_client().get(f'/orders/?limit={args.page_size}').status_code
+
+    def get_order():
+        return order_app.test_client().get(f'/orders/{random.randint(1, 50)}').status_code
+
+    def login():
+        return user_app.test_client().post('/auth/login', json={
+            'username': f'bench-user-{random.randrange(args.users)}',
+            'password': PASSWORD
+        }).status_code
+
+    return {
+        'create_order': create_order,
+        'list_orders': list_orders,
+        'get_order': get_order,
+        'login': login,
+    }
+
+
+def run(workload, concurrency, total):
+    samples = []
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        status = workload()
+        latency = time.perf_counter() - start
+        with lock:
+            samples.append((latency, status))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated thread counts')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per workload per concurrency level')
+    parser.add_argument('--workloads', default='create_order,list_orders,get_order,login')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--menu-items', type=int, default=50)
+    parser.add_argument('--cart-size', type=int, default=3)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Inline bcrypt: a spawned hashing pool can't import the isolated service modules
+        cluster = Cluster(workdir, env={'BCRYPT_POOL_SIZE': '0'})
+        user_ids, restaurant_id, menu_ids = seed(cluster, args.users, args.menu_items)
+        workloads = make_workloads(cluster, args, user_ids, restaurant_id, menu_ids)
+
+        print_header(label_width=14, extra=f"{'conc':>5} ")
+        for name in args.workloads.split(','):
+            for concurrency in [int(c) for c in args.concurrency.split(',')]:
+                samples, elapsed = run(workloads[name], concurrency, args.requests)
+                print_row(name, samples, elapsed, label_width=14, extra=f'{concurrency:>5} ')
+
+
+if __name__ == '__main__':
+    main()
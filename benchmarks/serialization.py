@@ -0,0 +1,89 @@
+"""
+Microbenchmark of response serialization for a page of orders.
+
+Compares the old path (Order.to_dict() per row, then restx marshal() over the
+result) with serializers.compile_model(), which reads the ORM rows once. Both
+are encoded with restx output_json and must produce identical bytes.
+
+Usage:
+    python benchmarks/serialization.py --rows 200 --items 3 --repeat 50
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from flask_restx import marshal
+from flask_restx.representations import output_json
+from harness import load_service
+from bench_utils import percentile
+
+
+def seed(models, rows, items):
+    db = models.db
+    for i in range(rows):
+        order = models.Order(user_id=random.randint(1, 100), restaurant_id=1,
+                             total_price=round(random.uniform(5, 200), 2), status='PAID')
+        db.session.add(order)
+        db.session.flush()
+        for _ in range(items):
+            db.session.add(models.OrderItem(order_id=order.id, menu_item_id=random.randint(1, 500),
+                                            quantity=random.randint(1, 3),
+                                            price_at_time=round(random.uniform(1, 30), 2)))
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    body = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - start)
+    return body, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200, help='Orders per page')
+    parser.add_argument('--items', type=int, default=3, help='Items per order')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        modules = load_service('order-service', f"sqlite:///{Path(workdir) / 'orders.db'}")
+        app, models = modules['app'].app, modules['models']
+        page_model = modules['app'].order_page_model
+        convert = modules['serializers'].compile_model(page_model)
+        modules['migrations'].run_migrations(app)
+
+        with app.test_request_context('/orders/'):
+            seed(models, args.rows, args.items)
+            rows = models.Order.query.order_by(models.Order.id).all()
+            for row in rows:
+                row.items
+
+            def legacy():
+                page = {'items': [row.to_dict() for row in rows], 'next_cursor': None}
+                return output_json(marshal(page, page_model), 200).get_data()
+
+            def fast():
+                return output_json(convert({'items': rows, 'next_cursor': None}), 200).get_data()
+
+            legacy_body, legacy_samples = timed(legacy, args.repeat)
+            fast_body, fast_samples = timed(fast, args.repeat)
+
+    if legacy_body != fast_body:
+        raise SystemExit('Serialized output differs between the two paths')
+
+    print(f'{args.rows} orders x {args.items} items, {len(fast_body)} bytes per page, identical output')
+    print(f"{'path':<18} {'p50 ms':>8} {'p95 ms':>8} {'rows/s':>10}")
+    for name, samples in (('to_dict+marshal', legacy_samples), ('compiled', fast_samples)):
+        p50 = percentile(samples, 50)
+        print(f'{name:<18} {p50 * 1000:>8.2f} {percentile(samples, 95) * 1000:>8.2f} {args.rows / p50:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Rebuild request traces from the JSON-lines span files written by the services.
+
+Each service appends spans to its TRACE_EXPORT_PATH. Pass one or more of those
+files; the script prints the span tree of one trace, or of the slowest traces,
+with per-span offsets so the critical path of a slow order is easy to read.
+
+Usage:
+    python benchmarks/trace_tree.py traces/*.jsonl --slowest 3
+    python benchmarks/trace_tree.py traces/*.jsonl --trace-id 4f1c...
+"""
+import argparse
+import json
+from collections import defaultdict
+
+
+def load_spans(paths):
+    traces = defaultdict(list)
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    span = json.loads(line)
+                    traces[span['trace_id']].append(span)
+    return traces
+
+
+def print_tree(spans, show_sql):
+    by_parent = defaultdict(list)
+    ids = {span['span_id'] for span in spans}
+    for span in spans:
+        parent = span['parent_id'] if span['parent_id'] in ids else None
+        by_parent[parent].append(span)
+    origin = min(span['start'] for span in spans)
+
+    def walk(parent, depth):
+        for span in sorted(by_parent[parent], key=lambda s: s['start']):
+            if span['kind'] == 'db' and not show_sql:
+                continue
+            offset = (span['start'] - origin) * 1000
+            detail = span['attributes'].get('status', span['attributes'].get('statement', ''))
+            print(f"{offset:>9.1f}ms {span['duration_ms']:>9.1f}ms  {'  ' * depth}"
+                  f"[{span['service']}] {span['kind']} {span['name']} {detail}")
+            walk(span['span_id'], depth + 1)
+
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--trace-id')
+    parser.add_argument('--slowest', type=int, default=1)
+    parser.add_argument('--sql', action='store_true', help='Include individual SQL spans')
+    args = parser.parse_args()
+
+    traces = load_spans(args.files)
+    if args.trace_id:
+        selected = [args.trace_id]
+    else:
+        def root_duration(trace_id):
+            return max(s['duration_ms'] for s in traces[trace_id] if s['kind'] == 'server')
+        selected = sorted(traces, key=root_duration, reverse=True)[:args.slowest]
+
+    for trace_id in selected:
+        print(f'trace {trace_id}')
+        print_tree(traces[trace_id], args.sql)
+        print()
+
+
+if __name__ == '__main__':
+    main()
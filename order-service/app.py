@@ -1,8 +1,21 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_restx import Api, Resource, fields
-from models import db, Order, OrderItem
+from flask_restx import Api, Resource, fields, reqparse, inputs
+from models import db, Order, OrderItem, PaymentOutbox, RestaurantDailyRevenue, UserSpend, MenuItemReplica, MenuSyncState
 from config import Config
+from http_client import service_client
+from metrics import init_metrics
+from tracing import init_tracing
+from health import init_health
+from cache import TTLCache
+from circuit_breaker import CircuitBreaker, CircuitOpen
+from fanout import LookupFailed, gather
+from idempotency import idempotent
+from pagination import pagination_parser, page_model, paginate, add_filter_arguments, apply_filters
+from serializers import serialize_with
+from summaries import set_status, record_status_change
+from datetime import datetime, timedelta
+from functools import partial
 import os
 import requests
 
@@ -12,6 +25,78 @@ app.config.from_object(Config)
 db.init_app(app)
 CORS(app)
 
+# user_id -> True/False; 404s are cached for the shorter USER_CACHE_NEGATIVE_TTL
+user_cache = TTLCache(maxsize=Config.USER_CACHE_MAXSIZE, ttl=Config.USER_CACHE_TTL)
+
+user_breaker = CircuitBreaker('user-service')
+restaurant_breaker = CircuitBreaker('restaurant-service')
+payment_breaker = CircuitBreaker('payment-service')
+
+def user_exists(user_id):
+    """Check a user against User Service, skipping the call for recently seen ids"""
+    exists = user_cache.get(user_id)
+    if exists is not None:
+        return exists
+
+    user_url = f"{Config.USER_SERVICE_URL}/internal/users/{user_id}"
+    user_res = user_breaker.call(service_client.get, user_url)
+    if user_res.status_code == 200:
+        user_cache.set(user_id, True)
+        return True
+    if user_res.status_code == 404:
+        user_cache.set(user_id, False, ttl=Config.USER_CACHE_NEGATIVE_TTL)
+    return False
+
+def require_user(user_id):
+    if not user_exists(user_id):
+        raise LookupFailed({'error': 'User not found'}, 404)
+
+def error_message(response, default):
+    """The 'error' of a downstream error response, or default when its body is not JSON"""
+    try:
+        return response.json().get('error', default)
+    except requests.exceptions.JSONDecodeError:
+        return default
+
+def menu_item_ids(item_inputs):
+    """Sorted distinct menu_item_ids of the order, or None unless every item has an integer id"""
+    if not isinstance(item_inputs, list) or not item_inputs:
+        return None
+    ids = set()
+    for item_in in item_inputs:
+        item_id = item_in.get('menu_item_id') if isinstance(item_in, dict) else None
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            return None
+        ids.add(item_id)
+    return sorted(ids)
+
+def fetch_menu_items(item_ids):
+    """Look up the ordered menu items in batches of MENU_ITEMS_BATCH_LIMIT ids, keyed by id"""
+    items_url = f"{Config.RESTAURANT_SERVICE_URL}/internal/menu-items"
+    menu_items = {}
+    for start in range(0, len(item_ids), Config.MENU_ITEMS_BATCH_LIMIT):
+        chunk = item_ids[start:start + Config.MENU_ITEMS_BATCH_LIMIT]
+        items_res = restaurant_breaker.call(service_client.get, items_url, params={'ids': ','.join(str(i) for i in chunk)})
+        if items_res.status_code != 200:
+            raise LookupFailed({'error': error_message(items_res, 'Failed to fetch menu items')}, 400)
+        menu_items.update((item['id'], item) for item in items_res.json())
+    return menu_items
+
+def replica_menu_items(item_ids):
+    """Menu items from the local replica, or None when it is stale or lacks any of them"""
+    if Config.MENU_REPLICA_MAX_STALENESS <= 0:
+        return None
+    state = MenuSyncState.query.get(1)
+    if state is None or state.synced_at is None:
+        return None
+    if datetime.utcnow() - state.synced_at > timedelta(seconds=Config.MENU_REPLICA_MAX_STALENESS):
+        return None
+    rows = MenuItemReplica.query.filter(MenuItemReplica.id.in_(item_ids)).all()
+    if len(rows) != len(item_ids):
+        # Not synced yet, or not a real item: restaurant-service has the final word
+        return None
+    return {row.id: row.to_dict() for row in rows}
+
 api = Api(app, doc='/api-docs/', version='1.0',
           title='Order Service API',
           description='API for creating and managing orders',
@@ -25,6 +110,19 @@ api = Api(app, doc='/api-docs/', version='1.0',
               }
           })
 
+init_metrics(app, api, db)
+init_tracing(app, db)
+# restaurant-service is left out: orders are priced from the menu replica while it is down
+init_health(app, db, dependencies={
+    'user-service': Config.USER_SERVICE_URL,
+    'payment-service': Config.PAYMENT_SERVICE_URL
+})
+
+@api.errorhandler(CircuitOpen)
+def handle_circuit_open(error):
+    """Answer at once while a dependency is failing instead of waiting out its timeout"""
+    return {'error': str(error)}, 503, {'Retry-After': str(error.retry_after)}
+
 order_item_model = api.model('OrderItem', {
     'menu_item_id': fields.Integer(required=True, description='ID of the menu item'),
     'quantity': fields.Integer(required=True, description='Quantity of the menu item'),
@@ -42,6 +140,8 @@ order_model = api.model('Order', {
     'items': fields.List(fields.Nested(order_item_model), description='List of items in the order')
 })
 
+order_page_model = page_model(api, 'OrderPage', order_model)
+
 order_item_input_model = api.model('OrderItemInput', {
     'menu_item_id': fields.Integer(required=True),
     'quantity': fields.Integer(required=True)
@@ -54,47 +154,79 @@ order_input_model = api.model('OrderInput', {
 
 orders_ns = api.namespace('orders', description='Order operations')
 
+ORDER_STATUSES = ['PENDING', 'PAID', 'FAILED', 'CANCELLED', 'REFUNDED']
+ORDER_FILTERS = ('user_id', 'restaurant_id', 'status')
+order_list_parser = add_filter_arguments(pagination_parser, ORDER_FILTERS, statuses=ORDER_STATUSES)
+
+def defer_payment(order, payment_payload):
+    """
+    The order is committed but the payment outcome is unknown: hand it to
+    outbox_worker.py, which retries with the same Idempotency-Key, and answer
+    202 PENDING as in async mode. A 5xx here would release the key and let the
+    client's retry create a second order.
+    """
+    db.session.add(PaymentOutbox(
+        order_id=order.id,
+        user_id=payment_payload['user_id'],
+        amount=payment_payload['amount']
+    ))
+    db.session.commit()
+    return order, 202
+
 @orders_ns.route('/')
 class OrderList(Resource):
     @orders_ns.doc('list_orders', security='Bearer Auth')
-    @orders_ns.marshal_list_with(order_model)
+    @orders_ns.expect(order_list_parser)
+    @serialize_with(orders_ns, order_page_model)
     def get(self):
-        """List all orders"""
-        orders = Order.query.all()
-        return [o.to_dict() for o in orders]
+        """List orders, optionally filtered by user, restaurant, status and created_at range"""
+        args = order_list_parser.parse_args()
+        query = apply_filters(Order.query, Order, args, ORDER_FILTERS)
+        return paginate(query, Order, args['limit'], args['after'])
 
-    @orders_ns.doc('create_order', security='Bearer Auth')
+    @orders_ns.doc('create_order', security='Bearer Auth',
+                   params={'Idempotency-Key': {'in': 'header', 'description': 'Optional key; retries with the same key return the original response'}})
     @orders_ns.expect(order_input_model)
-    @orders_ns.marshal_with(order_model, code=201)
+    @orders_ns.response(503, 'A dependency is unavailable (circuit open)')
+    @idempotent('orders')
+    @serialize_with(orders_ns, order_model, code=201)
     def post(self):
         """
         Create a new order.
         Ini adalah CONSUMER endpoint utama.
         Mengonsumsi User, Restaurant, dan Payment service.
+        Dengan ASYNC_PAYMENTS=true, payment dijalankan oleh outbox_worker.py
+        dan endpoint ini langsung mengembalikan 202 dengan status PENDING.
         """
         data = request.get_json()
         user_id = data.get('user_id')
         restaurant_id = data.get('restaurant_id')
         item_inputs = data.get('items')
+        item_ids = menu_item_ids(item_inputs)
+        if item_ids is None:
+            return {'error': 'items must be a non-empty list, each with an integer menu_item_id'}, 400
         
+        breakers = (user_breaker,) if Config.ASYNC_PAYMENTS else (user_breaker, payment_breaker)
+        for breaker in breakers:
+            breaker.raise_if_open()
+
         try:
-            user_url = f"{Config.USER_SERVICE_URL}/internal/users/{user_id}"
-            user_res = requests.get(user_url)
-            if user_res.status_code != 200:
-                return {'error': 'User not found'}, 404
+            menu_items = replica_menu_items(item_ids)
+            if menu_items is None:
+                # User check and live menu lookup are independent: latency is the slower of the two
+                _, menu_items = gather(partial(require_user, user_id), partial(fetch_menu_items, item_ids))
+            else:
+                require_user(user_id)
 
             total_price = 0
             order_items_data = []
             
             for item_in in item_inputs:
                 item_id = item_in.get('menu_item_id')
-                item_url = f"{Config.RESTAURANT_SERVICE_URL}/internal/menu-items/{item_id}"
-                item_res = requests.get(item_url)
-                
-                if item_res.status_code != 200:
+                item_data = menu_items.get(item_id)
+                if not item_data:
                     return {'error': f'Menu item {item_id} not found'}, 404
                 
-                item_data = item_res.json()
                 price = item_data.get('price')
                 quantity = item_in.get('quantity')
                 
@@ -112,17 +244,23 @@ class OrderList(Resource):
                 status='PENDING'
             )
             db.session.add(new_order)
-            db.session.commit()
+            db.session.flush()
 
-            for item_data in order_items_data:
-                order_item = OrderItem(
+            # Header and items go out in one transaction; items as one executemany
+            db.session.execute(
+                db.insert(OrderItem),
+                [{'order_id': new_order.id, **item_data} for item_data in order_items_data]
+            )
+
+            if Config.ASYNC_PAYMENTS:
+                db.session.add(PaymentOutbox(
                     order_id=new_order.id,
-                    menu_item_id=item_data['menu_item_id'],
-                    quantity=item_data['quantity'],
-                    price_at_time=item_data['price_at_time']
-                )
-                db.session.add(order_item)
-            
+                    user_id=user_id,
+                    amount=total_price
+                ))
+                db.session.commit()
+                return new_order, 202
+
             db.session.commit()
 
             payment_url = f"{Config.PAYMENT_SERVICE_URL}/internal/process"
@@ -131,21 +269,28 @@ class OrderList(Resource):
                 'order_id': new_order.id,
                 'amount': total_price
             }
-            payment_res = requests.post(payment_url, json=payment_payload)
-
             try:
-                if payment_res.status_code == 200:
-                    new_order.status = 'PAID'
-                    db.session.commit()
-                    return new_order.to_dict(), 201
-                else:
-                    new_order.status = 'FAILED'
-                    db.session.commit()
-                    error_msg = payment_res.json().get('error', 'Payment failed')
-                    return {'error': error_msg}, 400
-            except requests.exceptions.JSONDecodeError:
-                return {'error': 'Failed to decode JSON response from payment service.', 'response_text': payment_res.text}, 502
+                payment_res = payment_breaker.call(service_client.post, payment_url, json=payment_payload,
+                                                   headers={'Idempotency-Key': f'order-{new_order.id}'})
+            except CircuitOpen:
+                new_order.status = 'FAILED'
+                db.session.commit()
+                raise
+            except requests.exceptions.RequestException:
+                return defer_payment(new_order, payment_payload)
 
+            if payment_res.status_code == 200:
+                set_status(new_order, 'PAID')
+                db.session.commit()
+                return new_order, 201
+            if payment_res.status_code >= 500 or payment_res.status_code == 409:
+                return defer_payment(new_order, payment_payload)
+            new_order.status = 'FAILED'
+            db.session.commit()
+            return {'error': error_message(payment_res, 'Payment failed')}, 400
+
+        except LookupFailed as e:
+            return e.body, e.code
         except requests.exceptions.RequestException as e:
             return jsonify({'error': f'Service communication error: {str(e)}'}), 500
 
@@ -154,54 +299,119 @@ class OrderList(Resource):
 @orders_ns.param('id', 'The order identifier')
 class OrderResource(Resource):
     @orders_ns.doc('get_order', security='Bearer Auth')
-    @orders_ns.marshal_with(order_model)
+    @serialize_with(orders_ns, order_model)
     def get(self, id):
         """Get order by ID"""
         order = Order.query.get(id)
         if not order:
             return {'error': 'Order not found'}, 404
-        return order.to_dict()
+        return order
 
     @orders_ns.doc('update_order_status', security='Bearer Auth')
-    @orders_ns.expect(api.model('OrderStatusUpdate', {'status': fields.String(required=True, enum=['PENDING', 'PAID', 'FAILED', 'CANCELLED', 'REFUNDED'])}))
-    @orders_ns.marshal_with(order_model)
+    @orders_ns.expect(api.model('OrderStatusUpdate', {'status': fields.String(required=True, enum=ORDER_STATUSES)}))
+    @serialize_with(orders_ns, order_model)
     def put(self, id):
         """Update order status by ID"""
-        order = Order.query.get(id)
+        # Row lock so concurrent status changes can't double-count the revenue summaries
+        order = Order.query.with_for_update().get(id)
         if not order:
             return {'error': 'Order not found'}, 404
 
         data = request.get_json()
         new_status = data.get('status')
-        if new_status not in ['PENDING', 'PAID', 'FAILED', 'CANCELLED', 'REFUNDED']:
+        if new_status not in ORDER_STATUSES:
             return {'error': 'Invalid status. Allowed: PENDING, PAID, FAILED, CANCELLED, REFUNDED'}, 400
         
-        order.status = new_status
+        set_status(order, new_status)
         db.session.commit()
-        return order.to_dict()
+        return order
 
     @orders_ns.doc('delete_order', security='Bearer Auth')
     @orders_ns.response(200, 'Order deleted successfully')
     def delete(self, id):
         """Delete order by ID"""
-        order = Order.query.get(id)
+        order = Order.query.with_for_update().get(id)
         if not order:
             return {'error': 'Order not found'}, 404
         
         if order.status == 'PAID':
             return {'error': 'Cannot delete a paid order. Please set status to CANCELLED or REFUNDED instead.'}, 400
 
+        record_status_change(order, order.status, None)
         OrderItem.query.filter_by(order_id=id).delete()
+        PaymentOutbox.query.filter_by(order_id=id).delete()
         db.session.delete(order)
         db.session.commit()
         return {'message': 'Order deleted successfully'}, 200
 
+reports_ns = api.namespace('reports', description='Revenue and spend reports, read from incrementally maintained summaries')
+
+summary_totals = {
+    'paid_count': fields.Integer(description='Orders currently PAID'),
+    'paid_total': fields.Float(description='Sum of total_price over PAID orders'),
+    'refunded_count': fields.Integer(description='Orders currently REFUNDED'),
+    'refunded_total': fields.Float(description='Sum of total_price over REFUNDED orders')
+}
+summary_totals_model = api.model('SummaryTotals', summary_totals)
+revenue_day_model = api.model('RevenueDay', {'day': fields.Date(description='Order creation day (UTC)'), **summary_totals})
+restaurant_revenue_model = api.model('RestaurantRevenue', {
+    'restaurant_id': fields.Integer,
+    'days': fields.List(fields.Nested(revenue_day_model)),
+    'totals': fields.Nested(summary_totals_model)
+})
+user_spend_model = api.model('UserSpend', {'user_id': fields.Integer, **summary_totals})
+
+revenue_parser = reqparse.RequestParser()
+revenue_parser.add_argument('day_from', type=inputs.date_from_iso8601, location='args', help='First day to include (YYYY-MM-DD)')
+revenue_parser.add_argument('day_to', type=inputs.date_from_iso8601, location='args', help='Last day to include (YYYY-MM-DD)')
+
+def summary_fields(row):
+    return {name: round(getattr(row, name), 2) if name.endswith('_total') else getattr(row, name)
+            for name in summary_totals}
+
+@reports_ns.route('/restaurants/<int:restaurant_id>/revenue')
+@reports_ns.param('restaurant_id', 'The restaurant identifier')
+class RestaurantRevenueReport(Resource):
+    @reports_ns.doc('restaurant_revenue', security='Bearer Auth')
+    @reports_ns.expect(revenue_parser)
+    @serialize_with(reports_ns, restaurant_revenue_model)
+    def get(self, restaurant_id):
+        """Daily PAID/REFUNDED totals for a restaurant, optionally limited to a day range"""
+        args = revenue_parser.parse_args()
+        query = RestaurantDailyRevenue.query.filter_by(restaurant_id=restaurant_id)
+        if args['day_from']:
+            query = query.filter(RestaurantDailyRevenue.day >= args['day_from'])
+        if args['day_to']:
+            query = query.filter(RestaurantDailyRevenue.day <= args['day_to'])
+
+        days = [{'day': row.day, **summary_fields(row)} for row in query.order_by(RestaurantDailyRevenue.day)]
+        totals = {name: sum(day[name] for day in days) for name in summary_totals}
+        totals = {name: round(value, 2) if name.endswith('_total') else value for name, value in totals.items()}
+        return {'restaurant_id': restaurant_id, 'days': days, 'totals': totals}
+
+@reports_ns.route('/users/<int:user_id>/spend')
+@reports_ns.param('user_id', 'The user identifier')
+class UserSpendReport(Resource):
+    @reports_ns.doc('user_spend', security='Bearer Auth')
+    @serialize_with(reports_ns, user_spend_model)
+    def get(self, user_id):
+        """PAID/REFUNDED totals for a user (zeros when the user has no such orders)"""
+        row = UserSpend.query.get(user_id)
+        totals = summary_fields(row) if row else dict.fromkeys(summary_totals, 0)
+        return {'user_id': user_id, **totals}
+
+@app.route('/internal/users/<int:user_id>/cache', methods=['DELETE'])
+def invalidate_user_cache(user_id):
+    """Internal endpoint for User Service to drop a cached user lookup"""
+    user_cache.delete(user_id)
+    return jsonify({'message': 'User cache entry invalidated'})
+
 @app.route('/health')
 def health_check():
     return jsonify({'status': 'healthy', 'service': os.getenv('SERVICE_NAME')})
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+    from migrations import run_migrations
+    run_migrations(app)
     port = Config.PORT
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
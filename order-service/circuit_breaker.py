@@ -0,0 +1,115 @@
+"""
+Per-dependency circuit breakers for internal service calls.
+
+A breaker remembers the outcome of the last BREAKER_WINDOW calls. Once at
+least BREAKER_MIN_CALLS are recorded and the failure rate reaches
+BREAKER_FAILURE_RATE it opens: calls fail immediately with CircuitOpen
+(answered as 503 with Retry-After) instead of holding a worker for the full
+read timeout. After BREAKER_OPEN_SECONDS a single probe call is let through
+(half-open); success closes the breaker, failure opens it again.
+
+Timeouts, connection errors and 5xx responses count as failures; a 4xx means
+the dependency answered. State is kept per process, so every gunicorn worker
+trips on its own; /metrics reports the worst state across live workers.
+"""
+import math
+import threading
+import time
+from collections import deque
+from config import Config
+from metrics import BREAKER_REJECTED, BREAKER_STATE, BREAKER_TRANSITIONS
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f'{name} is unavailable, please retry shortly')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_rate=None, min_calls=None, window=None, open_seconds=None):
+        self.name = name
+        self.failure_rate = Config.BREAKER_FAILURE_RATE if failure_rate is None else failure_rate
+        self.min_calls = Config.BREAKER_MIN_CALLS if min_calls is None else min_calls
+        self.open_seconds = Config.BREAKER_OPEN_SECONDS if open_seconds is None else open_seconds
+        self._outcomes = deque(maxlen=Config.BREAKER_WINDOW if window is None else window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def _transition(self, state, now):
+        self._state = state
+        if state == OPEN:
+            self._opened_at = now
+        if state != HALF_OPEN:
+            self._outcomes.clear()
+        self._probing = False
+        BREAKER_STATE.labels(self.name).set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(self.name, state).inc()
+
+    def _refresh(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, now)
+
+    def _reject(self, now):
+        BREAKER_REJECTED.labels(self.name).inc()
+        remaining = self._opened_at + self.open_seconds - now if self._state == OPEN else 1
+        raise CircuitOpen(self.name, max(1, math.ceil(remaining)))
+
+    def raise_if_open(self):
+        """Fail fast before doing any local work; does not take the half-open probe slot"""
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            if self._state == OPEN:
+                self._reject(now)
+
+    def _acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._reject(now)
+
+    def _record(self, success):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED if success else OPEN, now)
+                return
+            if self._state == OPEN:
+                # Call started before the breaker tripped
+                return
+            self._outcomes.append(success)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._outcomes.count(False) / calls >= self.failure_rate:
+                self._transition(OPEN, now)
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn (a service_client request) through the breaker and return its response"""
+        self._acquire()
+        success = False
+        try:
+            response = fn(*args, **kwargs)
+            success = response.status_code < 500
+            return response
+        finally:
+            self._record(success)
@@ -0,0 +1,63 @@
+"""
+Run independent downstream lookups of one request concurrently.
+
+Calls go to a bounded thread pool (FANOUT_MAX_WORKERS, created lazily per
+process) and run inside a copy of the caller's context, so the Flask request,
+g (trace ID, read-primary flag) and therefore the outbound trace headers are
+the same as for a call made inline. Lookups must not use db.session or write
+to g: the copied context shares the request's session and g, neither of which
+is thread-safe. Each lookup records its phase timings into its own dict, which
+gather() merges into g.phase_times back on the request thread.
+
+The first lookup to raise aborts the fan-out. Lookups that have not started
+are cancelled; one already in flight runs out in the background, bounded by
+the HTTP timeouts, while the request answers immediately.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from config import Config
+from metrics import collect_phase_times, merge_phase_times
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+class LookupFailed(Exception):
+    """Raise from a lookup to stop its siblings and answer the request with (body, code)"""
+
+    def __init__(self, body, code):
+        super().__init__(body.get('error'))
+        self.body = body
+        self.code = code
+
+
+def _get_pool():
+    """Create the pool lazily per process, so gunicorn workers don't inherit the master's"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=Config.FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def gather(*lookups):
+    """Run zero-argument callables concurrently and return their results in order"""
+    if Config.FANOUT_MAX_WORKERS <= 0 or len(lookups) < 2:
+        return [lookup() for lookup in lookups]
+
+    pool = _get_pool()
+    futures = [pool.submit(contextvars.copy_context().run, collect_phase_times, lookup) for lookup in lookups]
+    done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+    for future in futures:
+        if future in done and future.exception() is None:
+            merge_phase_times(future.result()[1])
+    for future in futures:
+        if future in done and future.exception() is not None:
+            for other in pending:
+                other.cancel()
+            raise future.exception()
+    return [future.result()[0] for future in futures]
@@ -0,0 +1,83 @@
+"""
+Keep menu_item_replica in step with restaurant-service's menu change feed.
+
+Each page of GET /internal/menu-items/changes?since=<cursor> is applied in
+one transaction together with the new cursor, so a crash never skips or
+half-applies a page. menu_sync_state.synced_at is stamped whenever the feed
+has been read to its end; order creation prices from the replica only while
+that stamp is younger than MENU_REPLICA_MAX_STALENESS.
+
+Run a single instance; the cursor row is locked while a page is applied.
+
+Usage:
+    python menu_sync.py
+"""
+import time
+from datetime import datetime
+import requests
+from app import app
+from models import db, MenuItemReplica, MenuSyncState
+from config import Config
+from http_client import service_client
+
+
+def apply_changes(changes):
+    """Apply feed entries in version order to the replica table"""
+    ids = {change['menu_item_id'] for change in changes}
+    rows = {row.id: row for row in MenuItemReplica.query.filter(MenuItemReplica.id.in_(ids))} if ids else {}
+    for change in changes:
+        item_id = change['menu_item_id']
+        row = rows.get(item_id)
+        if change['op'] == 'delete':
+            if row is not None:
+                db.session.delete(row)
+                rows.pop(item_id)
+            continue
+        if row is None:
+            row = rows[item_id] = MenuItemReplica(id=item_id)
+            db.session.add(row)
+        row.restaurant_id = change['restaurant_id']
+        row.name = change['name']
+        row.price = change['price']
+        row.version = change['version']
+
+
+def sync_once(client=service_client):
+    """Read the feed until caught up, one transaction per page. Returns the number of changes applied."""
+    feed_url = f"{Config.RESTAURANT_SERVICE_URL}/internal/menu-items/changes"
+    applied = 0
+    while True:
+        state = MenuSyncState.query.with_for_update().get(1)
+        try:
+            response = client.get(feed_url, params={'since': state.version, 'limit': Config.MENU_SYNC_PAGE_SIZE})
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            db.session.rollback()
+            raise
+        page = response.json()
+
+        apply_changes(page['changes'])
+        state.version = page['next_since']
+        if not page['has_more']:
+            state.synced_at = datetime.utcnow()
+        db.session.commit()
+        applied += len(page['changes'])
+        if not page['has_more']:
+            return applied
+
+
+def main():
+    print(f"--- [MenuSync] Menu replica sync started (poll every {Config.MENU_SYNC_INTERVAL}s) ---")
+    with app.app_context():
+        while True:
+            try:
+                applied = sync_once()
+                if applied:
+                    print(f"[MenuSync] Applied {applied} menu change(s)")
+            except requests.exceptions.RequestException as e:
+                print(f"[MenuSync] Change feed unavailable, replica ages until the next poll: {e}")
+            time.sleep(Config.MENU_SYNC_INTERVAL)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from flask import Response, g, has_request_context, request
+from flask_restx.representations import output_json
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+
+# Own registry per service so several services can share one process (benchmarks/harness.py).
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set and values are aggregated across workers.
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'End-to-end request latency by route',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS, registry=registry)
+PHASE_LATENCY = Histogram(
+    'http_request_phase_seconds', 'Time spent per request in each phase (sql, http:<service>, serialization)',
+    ['method', 'route', 'phase'], buckets=LATENCY_BUCKETS, registry=registry)
+DOWNSTREAM_LATENCY = Histogram(
+    'downstream_request_duration_seconds', 'Latency of outbound calls to other services',
+    ['service', 'method', 'status'], buckets=LATENCY_BUCKETS, registry=registry)
+SQL_QUERIES = Counter(
+    'sql_queries_total', 'SQL statements executed while serving requests',
+    ['method', 'route'], registry=registry)
+BREAKER_STATE = Gauge(
+    'circuit_breaker_state', 'Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)',
+    ['dependency'], multiprocess_mode='livemax', registry=registry)
+BREAKER_TRANSITIONS = Counter(
+    'circuit_breaker_transitions_total', 'Circuit breaker state changes per dependency',
+    ['dependency', 'state'], registry=registry)
+BREAKER_REJECTED = Counter(
+    'circuit_breaker_rejected_total', 'Calls refused without contacting the dependency because its breaker was open',
+    ['dependency'], registry=registry)
+
+
+# Set while a task runs on another thread (fanout.gather), which must not touch g.phase_times
+_task_phase_times = contextvars.ContextVar('task_phase_times', default=None)
+
+
+def add_phase_time(phase, seconds):
+    """Accumulate time spent in a phase for the current request (no-op outside a request)"""
+    phases = _task_phase_times.get()
+    if phases is None:
+        if not has_request_context():
+            return
+        phases = g.setdefault('phase_times', {})
+    phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+def collect_phase_times(fn):
+    """Call fn with its phase timings kept apart from the request's; returns (result, timings)"""
+    phases = {}
+    token = _task_phase_times.set(phases)
+    try:
+        return fn(), phases
+    finally:
+        _task_phase_times.reset(token)
+
+
+def merge_phase_times(phases):
+    """Add timings returned by collect_phase_times to the current request"""
+    for phase, seconds in phases.items():
+        add_phase_time(phase, seconds)
+
+
+@contextmanager
+def timed_phase(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase_time(phase, time.perf_counter() - start)
+
+
+def observe_downstream(method, url, status, seconds):
+    service = urlsplit(url).hostname or 'unknown'
+    DOWNSTREAM_LATENCY.labels(service, method, status).observe(seconds)
+    add_phase_time(f'http:{service}', seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    add_phase_time('sql', elapsed)
+    if has_request_context():
+        g.sql_queries = g.get('sql_queries', 0) + 1
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def init_metrics(app, api, db):
+    """Record per-route latency histograms and expose them at /metrics"""
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @api.representation('application/json')
+    def timed_output_json(data, code, headers=None):
+        with timed_phase('serialization'):
+            return output_json(data, code, headers)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        if 'request_start' not in g or request.path == '/metrics':
+            return response
+        route = _route()
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(
+            time.perf_counter() - g.request_start)
+        for phase, seconds in g.get('phase_times', {}).items():
+            PHASE_LATENCY.labels(request.method, route, phase).observe(seconds)
+        if g.get('sql_queries'):
+            SQL_QUERIES.labels(request.method, route).inc(g.sql_queries)
+        return response
+
+    def metrics():
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            collected = CollectorRegistry()
+            multiprocess.MultiProcessCollector(collected)
+        else:
+            collected = registry
+        return Response(generate_latest(collected), mimetype=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
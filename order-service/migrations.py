@@ -0,0 +1,194 @@
+"""
+Versioned schema migrations for the Order Service.
+
+Each migration runs once, in version order, inside its own transaction and is
+recorded in the schema_migrations table. Migration 1 is the baseline: it
+creates the tables db.create_all() used to create and skips any that already
+exist, so databases created before migrations existed upgrade in place.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending migrations
+"""
+import sys
+from datetime import datetime
+import sqlalchemy as sa
+from models import db
+
+MIGRATIONS = []
+
+schema_migrations = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('description', sa.String(255), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def create_index_if_missing(conn, table, name, *columns, unique=False):
+    """Create an index unless one already leads with its columns (e.g. MySQL's FK index)"""
+    for existing in sa.inspect(conn).get_indexes(table):
+        if existing['name'] == name or existing['column_names'][:len(columns)] == list(columns):
+            return
+    target = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    sa.Index(name, *(target.c[column] for column in columns), unique=unique).create(conn)
+
+
+# Every migration declares the tables it creates as they were at that version,
+# never through models.py, so replaying history always yields the same schema.
+
+@migration(1, 'baseline: order, order_item and payment_outbox tables')
+def baseline(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'order', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, nullable=False),
+        sa.Column('restaurant_id', sa.Integer, nullable=False),
+        sa.Column('total_price', sa.Float, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime)
+    )
+    sa.Table(
+        'order_item', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('order_id', sa.Integer, sa.ForeignKey('order.id'), nullable=False),
+        sa.Column('menu_item_id', sa.Integer, nullable=False),
+        sa.Column('quantity', sa.Integer, nullable=False),
+        sa.Column('price_at_time', sa.Float, nullable=False)
+    )
+    sa.Table(
+        'payment_outbox', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('order_id', sa.Integer, sa.ForeignKey('order.id'), nullable=False, unique=True),
+        sa.Column('user_id', sa.Integer, nullable=False),
+        sa.Column('amount', sa.Float, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer, nullable=False),
+        sa.Column('last_error', sa.String(255)),
+        sa.Column('available_at', sa.DateTime, nullable=False),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, 'index order lookups and the payment outbox queue')
+def index_orders(conn):
+    create_index_if_missing(conn, 'order', 'ix_order_user_id', 'user_id')
+    create_index_if_missing(conn, 'order', 'ix_order_status', 'status')
+    create_index_if_missing(conn, 'order', 'ix_order_created_at', 'created_at')
+    create_index_if_missing(conn, 'order_item', 'ix_order_item_order_id', 'order_id')
+    create_index_if_missing(conn, 'payment_outbox', 'ix_payment_outbox_status_available_at', 'status', 'available_at')
+
+
+@migration(3, 'index order.restaurant_id for restaurant filters')
+def index_order_restaurant(conn):
+    create_index_if_missing(conn, 'order', 'ix_order_restaurant_id', 'restaurant_id')
+
+
+@migration(4, 'idempotency_key table')
+def idempotency_keys(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'idempotency_key', metadata,
+        sa.Column('key', sa.String(255), primary_key=True),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('response_code', sa.Integer),
+        sa.Column('response_body', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('expires_at', sa.DateTime, nullable=False, index=True)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(5, 'revenue and spend summary tables')
+def revenue_summaries(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'restaurant_daily_revenue', metadata,
+        sa.Column('restaurant_id', sa.Integer, primary_key=True),
+        sa.Column('day', sa.Date, primary_key=True),
+        sa.Column('paid_count', sa.Integer, nullable=False),
+        sa.Column('paid_total', sa.Float, nullable=False),
+        sa.Column('refunded_count', sa.Integer, nullable=False),
+        sa.Column('refunded_total', sa.Float, nullable=False)
+    )
+    sa.Table(
+        'user_spend', metadata,
+        sa.Column('user_id', sa.Integer, primary_key=True),
+        sa.Column('paid_count', sa.Integer, nullable=False),
+        sa.Column('paid_total', sa.Float, nullable=False),
+        sa.Column('refunded_count', sa.Integer, nullable=False),
+        sa.Column('refunded_total', sa.Float, nullable=False)
+    )
+    # Backfilled by `python summaries.py --rebuild`, not here: a full order scan
+    # must not hold up gunicorn startup or the migration transaction
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(6, 'menu item replica and its change feed cursor')
+def menu_replica(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'menu_item_replica', metadata,
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('restaurant_id', sa.Integer, nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('price', sa.Float, nullable=False),
+        sa.Column('version', sa.BigInteger, nullable=False)
+    )
+    sync_state = sa.Table(
+        'menu_sync_state', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('version', sa.BigInteger, nullable=False),
+        sa.Column('synced_at', sa.DateTime)
+    )
+    metadata.create_all(conn, checkfirst=True)
+    conn.execute(sa.insert(sync_state).values(id=1, version=0))
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(sa.select(schema_migrations.c.version))}
+
+
+def run_migrations(app):
+    """Apply pending migrations; a single version lookup when the schema is current"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            print(f"[Migrations] Applying {version}: {description}")
+            with db.engine.begin() as conn:
+                fn(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+
+
+def print_status(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{'applied' if version in applied else 'pending':<8} {version:>3}  {description}")
+
+
+if __name__ == '__main__':
+    from app import app
+    if '--status' in sys.argv:
+        print_status(app)
+    else:
+        run_migrations(app)
@@ -1,17 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
-    restaurant_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    restaurant_id = db.Column(db.Integer, nullable=False, index=True)
     total_price = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), nullable=False, default='PENDING')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default='PENDING', index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    items = db.relationship('OrderItem', backref='order', lazy=True)
+    items = db.relationship('OrderItem', backref='order', lazy='selectin')
 
     def to_dict(self):
         return {
@@ -27,7 +28,7 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
     menu_item_id = db.Column(db.Integer, nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price_at_time = db.Column(db.Float, nullable=False)
@@ -38,4 +39,68 @@ class OrderItem(db.Model):
             'menu_item_id': self.menu_item_id,
             'quantity': self.quantity,
             'price_at_time': self.price_at_time
-        }
\ No newline at end of file
+        }
+
+class PaymentOutbox(db.Model):
+    """Payment job written in the same transaction as its order (async payment mode)"""
+    __table_args__ = (db.Index('ix_payment_outbox_status_available_at', 'status', 'available_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='PENDING')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(255))
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class IdempotencyKey(db.Model):
+    """Stored response for a request carrying an Idempotency-Key header"""
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='IN_PROGRESS')
+    response_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class RestaurantDailyRevenue(db.Model):
+    """PAID/REFUNDED totals per restaurant per order day, maintained by summaries.py"""
+    restaurant_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    paid_count = db.Column(db.Integer, nullable=False, default=0)
+    paid_total = db.Column(db.Float, nullable=False, default=0)
+    refunded_count = db.Column(db.Integer, nullable=False, default=0)
+    refunded_total = db.Column(db.Float, nullable=False, default=0)
+
+class UserSpend(db.Model):
+    """PAID/REFUNDED totals per user, maintained by summaries.py"""
+    user_id = db.Column(db.Integer, primary_key=True)
+    paid_count = db.Column(db.Integer, nullable=False, default=0)
+    paid_total = db.Column(db.Float, nullable=False, default=0)
+    refunded_count = db.Column(db.Integer, nullable=False, default=0)
+    refunded_total = db.Column(db.Float, nullable=False, default=0)
+
+class MenuItemReplica(db.Model):
+    """Local copy of restaurant-service menu items, kept current by menu_sync.py"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    restaurant_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'restaurant_id': self.restaurant_id,
+            'name': self.name,
+            'price': self.price
+        }
+
+class MenuSyncState(db.Model):
+    """Single-row cursor into the restaurant-service menu change feed"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    synced_at = db.Column(db.DateTime)
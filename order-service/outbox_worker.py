@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timedelta
+import requests
+from app import app
+from models import db, Order, PaymentOutbox
+from config import Config
+from http_client import service_client
+from summaries import set_status
+
+
+def next_job():
+    """Claim the oldest due job; SKIP LOCKED lets several workers drain in parallel"""
+    return (PaymentOutbox.query
+            .filter(PaymentOutbox.status == 'PENDING', PaymentOutbox.available_at <= datetime.utcnow())
+            .order_by(PaymentOutbox.id)
+            .with_for_update(skip_locked=True)
+            .first())
+
+
+def error_message(response):
+    try:
+        return response.json().get('error', 'Payment failed')
+    except requests.exceptions.JSONDecodeError:
+        return f'HTTP {response.status_code}: {response.text[:200]}'
+
+
+def retry_or_fail(job, order, error):
+    """Back off exponentially, giving up after OUTBOX_MAX_ATTEMPTS"""
+    job.last_error = error[:255]
+    if job.attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+        job.status = 'FAILED'
+        set_status(order, 'FAILED')
+    else:
+        job.available_at = datetime.utcnow() + timedelta(seconds=min(2 ** job.attempts, 60))
+
+
+def claim(job):
+    """
+    Count this attempt, unless another worker got to the job since it was read.
+
+    SKIP LOCKED already keeps workers apart on MySQL; the conditional UPDATE
+    also holds where row locks are not available (SQLite).
+    """
+    claimed = PaymentOutbox.query.filter_by(id=job.id, status='PENDING', attempts=job.attempts).update(
+        {PaymentOutbox.attempts: PaymentOutbox.attempts + 1}, synchronize_session=False)
+    if not claimed:
+        db.session.rollback()
+        return False
+    db.session.refresh(job)
+    return True
+
+
+def process_job(job, client):
+    """Call payment-service for a claimed job and record the outcome; the caller commits"""
+    # Locked like PUT/DELETE /orders/<id>, so a concurrent status change cannot be overwritten
+    order = Order.query.with_for_update().get(job.order_id)
+
+    try:
+        response = client.post(f"{Config.PAYMENT_SERVICE_URL}/internal/process", json={
+            'user_id': job.user_id,
+            'order_id': job.order_id,
+            'amount': job.amount
+        }, headers={'Idempotency-Key': f'order-{job.order_id}'})
+    except requests.exceptions.RequestException as e:
+        retry_or_fail(job, order, f'Service communication error: {str(e)}')
+        return
+
+    if response.status_code == 200:
+        job.status = 'DONE'
+        set_status(order, 'PAID')
+    elif response.status_code < 500 and response.status_code != 409:
+        job.status = 'DONE'
+        job.last_error = error_message(response)[:255]
+        set_status(order, 'FAILED')
+    else:
+        retry_or_fail(job, order, error_message(response))
+
+
+def run_once(client=service_client, batch_size=None):
+    """Drain up to batch_size due jobs, committing after each one. Returns the count processed."""
+    processed = 0
+    for _ in range(batch_size or Config.OUTBOX_BATCH_SIZE):
+        job = next_job()
+        if not job:
+            break
+        if not claim(job):
+            continue
+        process_job(job, client)
+        db.session.commit()
+        processed += 1
+    return processed
+
+
+def main():
+    print(f"--- [Outbox] Payment outbox worker started (poll every {Config.OUTBOX_POLL_INTERVAL}s) ---")
+    with app.app_context():
+        while True:
+            processed = run_once()
+            if processed:
+                print(f"[Outbox] Processed {processed} payment job(s)")
+            else:
+                time.sleep(Config.OUTBOX_POLL_INTERVAL)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+from datetime import datetime
+from functools import wraps
+from http import HTTPStatus
+from flask import current_app, request
+from flask_restx import fields, marshal
+from flask_restx.marshalling import marshal_with
+from flask_restx.utils import merge, unpack
+from flask_restx.fields import get_value, is_indexable_but_not_string
+from metrics import timed_phase
+
+# Exact types whose value can be passed through unchanged by the matching restx field
+_PASSTHROUGH = {
+    fields.Integer: int,
+    fields.Float: float,
+    fields.String: str,
+    fields.Boolean: bool,
+}
+
+
+def _getter(key):
+    """Same lookup as restx get_value(), with a fast path for ORM rows and plain dicts"""
+    def get(obj):
+        if isinstance(obj, dict):
+            if key in obj:
+                return obj[key]
+        elif is_indexable_but_not_string(obj):
+            return get_value(key, obj)
+        return getattr(obj, key, None)
+    return get
+
+
+def _is_plain(field):
+    return field.attribute is None and field.default is None and not field.mask
+
+
+def _compile_field(key, field):
+    """Return obj -> value for one field, matching field.output(key, obj)"""
+    if isinstance(field, type):
+        field = field()
+    if '.' in key:
+        return lambda obj: field.output(key, obj)
+    get = _getter(key)
+    kind = type(field)
+
+    if kind in _PASSTHROUGH and _is_plain(field):
+        exact = _PASSTHROUGH[kind]
+
+        def convert(obj):
+            value = get(obj)
+            if value is None or type(value) is exact:
+                return value
+            return field.output(key, obj)
+        return convert
+
+    if kind is fields.DateTime and field.dt_format == 'iso8601' and _is_plain(field):
+        def convert(obj):
+            value = get(obj)
+            if value is None:
+                return None
+            if type(value) is datetime:
+                return value.isoformat()
+            return field.output(key, obj)
+        return convert
+
+    if (kind is fields.List and _is_plain(field) and type(field.container) is fields.Nested
+            and _is_plain(field.container) and not field.container.allow_null
+            and not field.container.skip_none):
+        nested = compile_model(field.container.nested)
+
+        def convert(obj):
+            value = get(obj)
+            if isinstance(value, (list, tuple)):
+                return [nested(item) for item in value]
+            if value is None:
+                return None
+            if isinstance(value, dict) or not is_indexable_but_not_string(value):
+                return [nested(value)]
+            return field.output(key, obj)
+        return convert
+
+    return lambda obj: field.output(key, obj)
+
+
+def compile_model(model):
+    """
+    Build a converter that produces exactly what restx marshal(data, model) does.
+
+    Each field is resolved once up front, so rows are read and formatted in a
+    single pass instead of going through to_dict() and then marshal().
+    """
+    model = getattr(model, 'resolved', model)
+    if getattr(model, '__mask__', None) or any(isinstance(field, dict) for field in model.values()):
+        return lambda data: marshal(data, model)
+
+    converters = [(key, _compile_field(key, field)) for key, field in model.items()]
+
+    def convert(data):
+        if isinstance(data, (list, tuple)):
+            return [convert(item) for item in data]
+        return {key: field(data) for key, field in converters}
+    return convert
+
+
+def serialize_with(ns, model, as_list=False, code=HTTPStatus.OK, description=None):
+    """
+    Drop-in replacement for ns.marshal_with(model) with the same Swagger docs and output.
+
+    Handlers return ORM rows (or dicts of rows) instead of to_dict() results.
+    Requests with an X-Fields mask fall back to restx marshal().
+    """
+    convert = compile_model(model)
+
+    def decorator(fn):
+        doc = {
+            'responses': {str(code): (description, [model], {}) if as_list else (description, model, {})},
+            '__mask__': True
+        }
+        fn.__apidoc__ = merge(getattr(fn, '__apidoc__', {}), doc)
+        masked = marshal_with(model, ordered=ns.ordered)(fn)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if ns.ordered or request.headers.get(current_app.config['RESTX_MASK_HEADER']):
+                return masked(*args, **kwargs)
+
+            resp = fn(*args, **kwargs)
+            with timed_phase('serialization'):
+                if isinstance(resp, tuple):
+                    data, status, headers = unpack(resp)
+                    return convert(data), status, headers
+                return convert(resp)
+        return wrapper
+    return decorator
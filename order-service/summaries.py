@@ -0,0 +1,124 @@
+"""
+Revenue and spend summaries for the Order Service.
+
+restaurant_daily_revenue and user_spend hold running PAID/REFUNDED counts and
+totals. record_status_change() adjusts them with atomic increments inside the
+caller's transaction whenever an order enters or leaves one of those statuses,
+so reports never scan the order table. Restaurant revenue is bucketed by the
+day the order was created (UTC).
+
+rebuild() recomputes both tables from order history, reading orders in
+keyset batches so memory stays bounded by the number of summary rows. It
+replaces the tables in one transaction; run it while order traffic is quiet,
+since status changes committed during the scan can be overwritten.
+
+Usage:
+    python summaries.py --rebuild [--batch-size 1000]
+"""
+import argparse
+from collections import defaultdict
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+from models import db, Order, RestaurantDailyRevenue, UserSpend
+
+TRACKED_STATUSES = ('PAID', 'REFUNDED')
+
+
+def _empty_totals():
+    return {'paid_count': 0, 'paid_total': 0.0, 'refunded_count': 0, 'refunded_total': 0.0}
+
+
+def _deltas(status, sign, amount):
+    """Column increments for adding (sign=1) or removing (sign=-1) one order in a tracked status"""
+    prefix = status.lower()
+    return {f'{prefix}_count': sign, f'{prefix}_total': sign * amount}
+
+
+def _increment(model, keys, deltas):
+    """UPDATE ... SET col = col + delta, creating the row first when it does not exist yet"""
+    table = model.__table__
+    where = [table.c[name] == value for name, value in keys.items()]
+    update = sa.update(table).where(*where).values({name: table.c[name] + delta for name, delta in deltas.items()})
+    if db.session.execute(update).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(sa.insert(table).values(**keys, **deltas))
+    except IntegrityError:
+        # A concurrent transaction inserted the row between our UPDATE and INSERT
+        db.session.execute(update)
+
+
+def record_status_change(order, old_status, new_status):
+    """Move an order's amount between summary buckets; call before committing the status change"""
+    if old_status == new_status:
+        return
+    for status, sign in ((old_status, -1), (new_status, 1)):
+        if status not in TRACKED_STATUSES:
+            continue
+        deltas = _deltas(status, sign, order.total_price)
+        _increment(RestaurantDailyRevenue, {'restaurant_id': order.restaurant_id, 'day': order.created_at.date()}, deltas)
+        _increment(UserSpend, {'user_id': order.user_id}, deltas)
+
+
+def set_status(order, status):
+    """Change an order's status and its summaries in the current transaction"""
+    record_status_change(order, order.status, status)
+    order.status = status
+
+
+def rebuild(conn, batch_size=1000):
+    """Replace both summary tables with totals recomputed from every PAID/REFUNDED order"""
+    orders = Order.__table__
+    restaurant_days = defaultdict(_empty_totals)
+    users = defaultdict(_empty_totals)
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(orders.c.id, orders.c.restaurant_id, orders.c.user_id,
+                      orders.c.total_price, orders.c.status, orders.c.created_at)
+            .where(orders.c.id > last_id, orders.c.status.in_(TRACKED_STATUSES))
+            .order_by(orders.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            for name, delta in _deltas(row.status, 1, row.total_price).items():
+                restaurant_days[(row.restaurant_id, row.created_at.date())][name] += delta
+                users[row.user_id][name] += delta
+        last_id = rows[-1].id
+
+    conn.execute(sa.delete(RestaurantDailyRevenue.__table__))
+    conn.execute(sa.delete(UserSpend.__table__))
+    if restaurant_days:
+        conn.execute(sa.insert(RestaurantDailyRevenue.__table__), [
+            {'restaurant_id': restaurant_id, 'day': day, **totals}
+            for (restaurant_id, day), totals in restaurant_days.items()
+        ])
+    if users:
+        conn.execute(sa.insert(UserSpend.__table__), [
+            {'user_id': user_id, **totals} for user_id, totals in users.items()
+        ])
+    return len(restaurant_days), len(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rebuild', action='store_true', help='Recompute the summary tables from order history')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Orders read per batch')
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    from app import app
+    with app.app_context():
+        with db.engine.begin() as conn:
+            restaurant_days, users = rebuild(conn, args.batch_size)
+    print(f"[Summaries] Rebuilt {restaurant_days} restaurant-day and {users} user summary rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,17 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_restx import Api, Resource, fields
+from sqlalchemy.exc import IntegrityError
 from models import db, Transaction
 from config import Config
+from http_client import service_client
+from idempotency import idempotent
+from circuit_breaker import CircuitBreaker, CircuitOpen
+from metrics import init_metrics
+from tracing import init_tracing
+from health import init_health
+from pagination import pagination_parser, page_model, paginate, add_filter_arguments, apply_filters
+from serializers import serialize_with
 import os
 import requests
 
@@ -25,6 +34,17 @@ api = Api(app, doc='/api-docs/', version='1.0',
               }
           })
 
+init_metrics(app, api, db)
+init_tracing(app, db)
+init_health(app, db, dependencies={'user-service': Config.USER_SERVICE_URL})
+
+user_breaker = CircuitBreaker('user-service')
+
+@api.errorhandler(CircuitOpen)
+def handle_circuit_open(error):
+    """Answer at once while User Service is failing instead of waiting out its timeout"""
+    return {'error': str(error)}, 503, {'Retry-After': str(error.retry_after)}
+
 transaction_model = api.model('Transaction', {
     'id': fields.Integer,
     'user_id': fields.Integer,
@@ -33,6 +53,7 @@ transaction_model = api.model('Transaction', {
     'status': fields.String,
     'created_at': fields.DateTime
 })
+transaction_page_model = page_model(api, 'TransactionPage', transaction_model)
 payment_input_model = api.model('PaymentInput', {
     'user_id': fields.Integer(required=True),
     'order_id': fields.Integer(required=True),
@@ -41,6 +62,10 @@ payment_input_model = api.model('PaymentInput', {
 
 payments_ns = api.namespace('payments', description='Payment operations')
 
+TRANSACTION_STATUSES = ['PENDING', 'SUCCESS', 'FAILED', 'REFUNDED']
+TRANSACTION_FILTERS = ('user_id', 'status')
+transaction_list_parser = add_filter_arguments(pagination_parser, TRANSACTION_FILTERS, statuses=TRANSACTION_STATUSES)
+
 transaction_update_model = api.model('TransactionUpdate', {
     'status': fields.String(description='Transaction status (SUCCESS/FAILED/PENDING)')
 })
@@ -50,27 +75,30 @@ internal_ns = api.namespace('internal', description='Internal service-to-service
 @payments_ns.route('/')
 class TransactionList(Resource):
     @payments_ns.doc('list_transactions', security='Bearer Auth')
-    @payments_ns.marshal_list_with(transaction_model)
+    @payments_ns.expect(transaction_list_parser)
+    @serialize_with(payments_ns, transaction_page_model)
     def get(self):
-        """List all transactions"""
-        return [t.to_dict() for t in Transaction.query.all()]
+        """List transactions, optionally filtered by user, status and created_at range"""
+        args = transaction_list_parser.parse_args()
+        query = apply_filters(Transaction.query, Transaction, args, TRANSACTION_FILTERS)
+        return paginate(query, Transaction, args['limit'], args['after'])
 
 @payments_ns.route('/<int:id>')
 @payments_ns.response(404, 'Transaction not found')
 @payments_ns.param('id', 'The transaction identifier')
 class TransactionResource(Resource):
     @payments_ns.doc('get_transaction', security='Bearer Auth')
-    @payments_ns.marshal_with(transaction_model)
+    @serialize_with(payments_ns, transaction_model)
     def get(self, id):
         """Get transaction by ID"""
         transaction = Transaction.query.get(id)
         if not transaction:
             return {'error': 'Transaction not found'}, 404
-        return transaction.to_dict()
+        return transaction
 
     @payments_ns.doc('update_transaction', security='Bearer Auth')
     @payments_ns.expect(transaction_update_model)
-    @payments_ns.marshal_with(transaction_model)
+    @serialize_with(payments_ns, transaction_model)
     def put(self, id):
         """
         Update transaction status (DEMO/TESTING ONLY)
@@ -86,14 +114,13 @@ class TransactionResource(Resource):
         data = request.get_json()
 
         if 'status' in data:
-            allowed_statuses = ['PENDING', 'SUCCESS', 'FAILED', 'REFUNDED']
-            if data['status'] in allowed_statuses:
+            if data['status'] in TRANSACTION_STATUSES:
                 transaction.status = data['status']
             else:
-                return {'error': f'Invalid status. Allowed: {allowed_statuses}'}, 400
+                return {'error': f'Invalid status. Allowed: {TRANSACTION_STATUSES}'}, 400
 
         db.session.commit()
-        return transaction.to_dict()
+        return transaction
 
     @payments_ns.doc('delete_transaction', security='Bearer Auth')
     @payments_ns.response(200, 'Transaction deleted successfully')
@@ -113,6 +140,25 @@ class TransactionResource(Resource):
         db.session.commit()
         return {'message': 'Transaction deleted successfully'}, 200
 
+def claim_transaction(user_id, order_id, amount):
+    """
+    The order's transaction, created PENDING on its first attempt.
+
+    A retry (the outbox worker, or a client after a 5xx) reuses the row; the
+    debit is sent again with the same reference, which the User Service
+    applies only once.
+    """
+    transaction = Transaction.query.filter_by(order_id=order_id).first()
+    if transaction is not None:
+        return transaction
+    db.session.add(Transaction(user_id=user_id, order_id=order_id, amount=amount, status='PENDING'))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent attempt for the same order created it first
+        db.session.rollback()
+    return Transaction.query.filter_by(order_id=order_id).one()
+
 @internal_ns.route('/process')
 class ProcessPaymentResource(Resource):
     @internal_ns.doc('process_payment', security='Bearer Auth')
@@ -120,6 +166,9 @@ class ProcessPaymentResource(Resource):
     @internal_ns.response(200, 'Payment processed successfully', transaction_model)
     @internal_ns.response(400, 'Payment failed (e.g., insufficient balance or invalid data)')
     @internal_ns.response(500, 'Failed to connect to dependent services (e.g., User Service)')
+    @internal_ns.response(503, 'User Service is unavailable (circuit open)')
+    @internal_ns.doc(params={'Idempotency-Key': {'in': 'header', 'description': 'Optional key; retries with the same key return the original response'}})
+    @idempotent('process-payment')
     def post(self):
         """
         Internal endpoint to process a payment.
@@ -134,20 +183,26 @@ class ProcessPaymentResource(Resource):
         if not all([user_id, order_id, amount]):
             return {'error': 'Missing required fields: user_id, order_id, amount'}, 400
 
-        new_transaction = Transaction(
-            user_id=user_id,
-            order_id=order_id,
-            amount=amount,
-            status='PENDING'
-        )
-        db.session.add(new_transaction)
+        user_breaker.raise_if_open()
+
+        new_transaction = claim_transaction(user_id, order_id, amount)
+        if new_transaction.user_id != user_id or new_transaction.amount != float(amount):
+            return {'error': f'Order {order_id} already has a payment for a different user or amount'}, 422
+        if new_transaction.status == 'SUCCESS':
+            return new_transaction.to_dict(), 200
+        new_transaction.status = 'PENDING'
         db.session.commit()
 
         try:
             balance_update_url = f"{Config.USER_SERVICE_URL}/internal/users/{user_id}/balance"
-            payload = {'type': 'debit', 'amount': amount}
+            payload = {'type': 'debit', 'amount': amount, 'reference': f'order-{order_id}'}
             
-            response = requests.put(balance_update_url, json=payload, timeout=10)
+            try:
+                response = user_breaker.call(service_client.put, balance_update_url, json=payload)
+            except CircuitOpen:
+                new_transaction.status = 'FAILED'
+                db.session.commit()
+                raise
             
             try:
                 if response.status_code == 200:
@@ -174,7 +229,7 @@ def health_check():
     return jsonify({'status': 'healthy', 'service': os.getenv('SERVICE_NAME')})
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+    from migrations import run_migrations
+    run_migrations(app)
     port = Config.PORT
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
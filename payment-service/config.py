@@ -5,6 +5,28 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
     PORT = int(os.getenv('PORT', 3004))
     SERVICE_NAME = os.getenv('SERVICE_NAME', 'payment-service')
-    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL')
\ No newline at end of file
+    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL')
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 2))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.2))
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+    TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH')
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 24 * 3600))
+    # How long an unfinished request holds its key; matches gunicorn's worker timeout
+    IDEMPOTENCY_LEASE = int(os.getenv('IDEMPOTENCY_LEASE', 120))
+    IDEMPOTENCY_PURGE_PROBABILITY = float(os.getenv('IDEMPOTENCY_PURGE_PROBABILITY', 0.01))
+    HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', 5))
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 1))
+    STARTUP_DB_TIMEOUT = float(os.getenv('STARTUP_DB_TIMEOUT', 120))
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 10))
+    BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 20))
+    BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', 15))
\ No newline at end of file
@@ -0,0 +1,49 @@
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+READ_ONLY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+def use_primary():
+    """Send every remaining query of this request to the primary"""
+    if has_request_context():
+        g.read_primary = True
+
+
+def reads_from_replica():
+    if not has_request_context() or request.method not in READ_ONLY_METHODS:
+        return False
+    if g.get('read_primary'):
+        return False
+    if request.headers.get(READ_PRIMARY_HEADER):
+        # Client just wrote and needs to read it back (read-your-writes)
+        g.read_primary = True
+        return False
+    return True
+
+
+def consistency_headers():
+    """Headers that carry a read-your-writes request on to downstream services"""
+    if has_request_context() and g.get('read_primary'):
+        return {READ_PRIMARY_HEADER: '1'}
+    return {}
+
+
+class RoutingSession(Session):
+    """Session that sends read-only requests to the replica bind when one is configured.
+
+    Writes, flushes, anything outside a request and anything after use_primary()
+    go to the primary. Once a request has written, the rest of it stays on the
+    primary so it can read its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND in self._db.engines:
+            if self._flushing or isinstance(clause, UpdateBase):
+                use_primary()
+            elif reads_from_replica():
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
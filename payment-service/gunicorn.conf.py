@@ -1,5 +1,15 @@
-import time
+import os
+import shutil
+
+# Must be set before prometheus_client is imported so every worker writes to shared files
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from prometheus_client import multiprocess
+from migrations import run_migrations
 from app import app, db
+from health import wait_for_db
 
 workers = 2
 worker_class = 'sync'
@@ -9,25 +19,15 @@ keepalive = 5
 graceful_timeout = 30
 
 accesslog = '-'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" request_id=%({x-request-id}o)s'
 errorlog = '-'
 loglevel = 'debug'
 
-def wait_for_db(app, max_retries=10, delay=2):
-    with app.app_context():
-        for i in range(max_retries):
-            try:
-                db.session.execute(db.text('SELECT 1')).scalar()
-                print("Database connection successful!")
-                return
-            except Exception as e:
-                print(f"Database not ready, retrying in {delay}s... (Attempt {i+1}/{max_retries})")
-                time.sleep(delay)
-        raise Exception("Failed to connect to the database after multiple retries.")
-
 def on_starting(server):
     print("--- [Gunicorn] Running DB Initializer for Payment Service ---")
-    wait_for_db(app)
-    with app.app_context():
-        print("[Gunicorn] Creating all tables...")
-        db.create_all()
-    print("--- [Gunicorn] DB Initializer Complete ---")
\ No newline at end of file
+    wait_for_db(app, db)
+    run_migrations(app)
+    print("--- [Gunicorn] DB Initializer Complete ---")
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from metrics import observe_downstream
+from db_routing import consistency_headers
+from tracing import add_span, new_span_id, trace_headers
+
+
+class ServiceSession(requests.Session):
+    """requests.Session that applies a default (connect, read) timeout, times and traces every call"""
+
+    def __init__(self, timeout, record_metrics=True):
+        super().__init__()
+        self.timeout = timeout
+        self.record_metrics = record_metrics
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        span_id = new_span_id()
+        kwargs['headers'] = {**trace_headers(span_id), **consistency_headers(), **(kwargs.get('headers') or {})}
+        wall_start = time.time()
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = super().request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.record_metrics:
+                observe_downstream(method, url, status, elapsed)
+            add_span(f'{method} {urlsplit(url).path}', 'client', span_id, wall_start, elapsed,
+                     url=url, status=status)
+
+
+def create_session(config, retries=None, record_metrics=True):
+    """Build a keep-alive session with per-host connection pools for internal calls.
+
+    Only idempotent GET/HEAD requests are retried on read errors and 502/503/504;
+    connection failures are retried for every method since nothing was sent yet.
+    retries overrides HTTP_RETRIES (0 for probes that must answer within their timeout).
+    record_metrics=False keeps calls out of downstream_request_duration_seconds,
+    so health probes do not skew the latency of real traffic.
+    """
+    retry = Retry(
+        total=config.HTTP_RETRIES if retries is None else retries,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session = ServiceSession(timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT),
+                             record_metrics=record_metrics)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+service_client = create_session(Config)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import Response, request
+from flask_restx.utils import unpack
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+from config import Config
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def _request_hash():
+    payload = request.get_json(silent=True)
+    if payload is not None:
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    else:
+        raw = request.get_data()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _purge_expired():
+    IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _take_over(record_key, request_hash, now):
+    """Reclaim an expired key: a COMPLETED row past its TTL, or an IN_PROGRESS row whose worker died"""
+    claimed = IdempotencyKey.query.filter(
+        IdempotencyKey.key == record_key,
+        IdempotencyKey.expires_at < now
+    ).update({
+        'request_hash': request_hash,
+        'status': 'IN_PROGRESS',
+        'response_code': None,
+        'response_body': None,
+        'created_at': now,
+        'expires_at': now + timedelta(seconds=Config.IDEMPOTENCY_LEASE)
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def _begin(record_key, request_hash):
+    """Claim the key, or return the response to send instead of running the handler"""
+    if random.random() < Config.IDEMPOTENCY_PURGE_PROBABILITY:
+        _purge_expired()
+
+    now = datetime.utcnow()
+    # IN_PROGRESS rows only hold a short lease; _complete extends it to the full TTL
+    db.session.add(IdempotencyKey(
+        key=record_key,
+        request_hash=request_hash,
+        status='IN_PROGRESS',
+        expires_at=now + timedelta(seconds=Config.IDEMPOTENCY_LEASE)
+    ))
+    try:
+        db.session.commit()
+        return None
+    except IntegrityError:
+        db.session.rollback()
+
+    if _take_over(record_key, request_hash, now):
+        return None
+    record = IdempotencyKey.query.get(record_key)
+    if record is None:
+        return _begin(record_key, request_hash)
+    if record.request_hash != request_hash:
+        return {'error': f'{IDEMPOTENCY_HEADER} was already used with a different request body'}, 422
+    if record.status != 'COMPLETED':
+        return {'error': 'A request with this Idempotency-Key is still being processed'}, 409, {'Retry-After': '1'}
+    return json.loads(record.response_body), record.response_code, {'Idempotent-Replayed': 'true'}
+
+
+def _complete(record_key, body, code):
+    record = IdempotencyKey.query.get(record_key)
+    record.status = 'COMPLETED'
+    record.response_code = code
+    record.response_body = json.dumps(body)
+    record.expires_at = datetime.utcnow() + timedelta(seconds=Config.IDEMPOTENCY_TTL)
+    db.session.commit()
+
+
+def _release(record_key):
+    db.session.rollback()
+    IdempotencyKey.query.filter_by(key=record_key).delete()
+    db.session.commit()
+
+
+def idempotent(scope):
+    """
+    Replay the stored response when a request repeats its Idempotency-Key.
+
+    2xx and 4xx responses are kept for IDEMPOTENCY_TTL seconds; 5xx responses
+    and exceptions release the key so the client can retry for real. A key
+    left IN_PROGRESS by a crashed worker is taken over after IDEMPOTENCY_LEASE.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return fn(*args, **kwargs)
+            if len(key) > 200:
+                return {'error': f'{IDEMPOTENCY_HEADER} must be at most 200 characters'}, 400
+
+            record_key = f'{scope}:{key}'
+            replay = _begin(record_key, _request_hash())
+            if replay is not None:
+                return replay
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                _release(record_key)
+                raise
+
+            body, code, _ = unpack(result)
+            if isinstance(body, Response) or code >= 500:
+                _release(record_key)
+            else:
+                _complete(record_key, body, code)
+            return result
+        return wrapper
+    return decorator
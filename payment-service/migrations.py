@@ -0,0 +1,118 @@
+"""
+Versioned schema migrations for the Payment Service.
+
+Each migration runs once, in version order, inside its own transaction and is
+recorded in the schema_migrations table. Migration 1 is the baseline: it
+creates the tables db.create_all() used to create and skips any that already
+exist, so databases created before migrations existed upgrade in place.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending migrations
+"""
+import sys
+from datetime import datetime
+import sqlalchemy as sa
+from models import db
+
+MIGRATIONS = []
+
+schema_migrations = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('description', sa.String(255), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def create_index_if_missing(conn, table, name, *columns, unique=False):
+    """Create an index unless one already leads with its columns (e.g. MySQL's FK index)"""
+    for existing in sa.inspect(conn).get_indexes(table):
+        if existing['name'] == name or existing['column_names'][:len(columns)] == list(columns):
+            return
+    target = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    sa.Index(name, *(target.c[column] for column in columns), unique=unique).create(conn)
+
+
+# Every migration declares the tables it creates as they were at that version,
+# never through models.py, so replaying history always yields the same schema.
+
+@migration(1, 'baseline: transaction table')
+def baseline(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'transaction', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, nullable=False),
+        sa.Column('order_id', sa.Integer, nullable=False, unique=True),
+        sa.Column('amount', sa.Float, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, 'index transaction.user_id and transaction.status')
+def index_transactions(conn):
+    create_index_if_missing(conn, 'transaction', 'ix_transaction_user_id', 'user_id')
+    create_index_if_missing(conn, 'transaction', 'ix_transaction_status', 'status')
+
+
+@migration(3, 'idempotency_key table')
+def idempotency_keys(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'idempotency_key', metadata,
+        sa.Column('key', sa.String(255), primary_key=True),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('response_code', sa.Integer),
+        sa.Column('response_body', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('expires_at', sa.DateTime, nullable=False, index=True)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(sa.select(schema_migrations.c.version))}
+
+
+def run_migrations(app):
+    """Apply pending migrations; a single version lookup when the schema is current"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            print(f"[Migrations] Applying {version}: {description}")
+            with db.engine.begin() as conn:
+                fn(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+
+
+def print_status(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{'applied' if version in applied else 'pending':<8} {version:>3}  {description}")
+
+
+if __name__ == '__main__':
+    from app import app
+    if '--status' in sys.argv:
+        print_status(app)
+    else:
+        run_migrations(app)
@@ -1,14 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Transaction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
     order_id = db.Column(db.Integer, nullable=False, unique=True)
     amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), nullable=False, default='PENDING')
+    status = db.Column(db.String(20), nullable=False, default='PENDING', index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -19,4 +20,14 @@ class Transaction(db.Model):
             'amount': self.amount,
             'status': self.status,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class IdempotencyKey(db.Model):
+    """Stored response for a request carrying an Idempotency-Key header"""
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='IN_PROGRESS')
+    response_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
\ No newline at end of file
@@ -0,0 +1,65 @@
+from datetime import timezone
+from flask_restx import reqparse, fields, inputs
+from config import Config
+
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('limit', type=int, location='args',
+                               help=f'Page size (default {Config.PAGE_SIZE_DEFAULT}, max {Config.PAGE_SIZE_MAX})')
+pagination_parser.add_argument('after', type=int, location='args',
+                               help='Cursor from a previous page: only return rows with id greater than this')
+
+
+def add_filter_arguments(parser, equals, statuses=None):
+    """Copy parser and add exact-match filters plus a created_at range (created_from <= t < created_to)"""
+    parser = parser.copy()
+    for name in equals:
+        if name == 'status':
+            parser.add_argument('status', choices=statuses, location='args', help='Filter by status')
+        else:
+            parser.add_argument(name, type=int, location='args', help=f'Filter by {name}')
+    parser.add_argument('created_from', type=inputs.datetime_from_iso8601, location='args',
+                        help='ISO 8601 lower bound (inclusive) on created_at')
+    parser.add_argument('created_to', type=inputs.datetime_from_iso8601, location='args',
+                        help='ISO 8601 upper bound (exclusive) on created_at')
+    return parser
+
+
+def _naive_utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_filters(query, model, args, equals):
+    """Turn parsed filter arguments into WHERE clauses on indexed columns"""
+    for name in equals:
+        if args.get(name) is not None:
+            query = query.filter(getattr(model, name) == args[name])
+    if args.get('created_from'):
+        query = query.filter(model.created_at >= _naive_utc(args['created_from']))
+    if args.get('created_to'):
+        query = query.filter(model.created_at < _naive_utc(args['created_to']))
+    return query
+
+
+def page_model(api, name, item_model):
+    """Swagger model for a keyset page: {'items': [...], 'next_cursor': int|null}"""
+    return api.model(name, {
+        'items': fields.List(fields.Nested(item_model)),
+        'next_cursor': fields.Integer(description='Pass as ?after= to fetch the next page; null on the last page')
+    })
+
+
+def paginate(query, model, limit=None, after=None):
+    """Keyset-paginate a query on model.id so each page costs one bounded SELECT"""
+    limit = min(max(limit or Config.PAGE_SIZE_DEFAULT, 1), Config.PAGE_SIZE_MAX)
+    if after is not None:
+        query = query.filter(model.id > after)
+
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'items': rows,
+        'next_cursor': rows[-1].id if has_more else None
+    }
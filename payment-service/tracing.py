@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+import uuid
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from config import Config
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+PARENT_SPAN_HEADER = 'X-Parent-Span-ID'
+
+_export_lock = threading.Lock()
+
+
+def new_span_id():
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id():
+    if has_request_context():
+        return g.get('trace_id')
+    return None
+
+
+def trace_headers(span_id):
+    """Headers that carry the current trace to a downstream service"""
+    trace_id = current_trace_id()
+    if not trace_id:
+        return {}
+    return {REQUEST_ID_HEADER: trace_id, PARENT_SPAN_HEADER: span_id}
+
+
+def add_span(name, kind, span_id, start, duration, **attributes):
+    """Record a finished child span of the current request span"""
+    if not Config.TRACE_EXPORT_PATH or not current_trace_id():
+        return
+    g.setdefault('spans', []).append({
+        'trace_id': g.trace_id,
+        'span_id': span_id,
+        'parent_id': g.span_id,
+        'service': Config.SERVICE_NAME,
+        'name': name,
+        'kind': kind,
+        'start': start,
+        'duration_ms': round(duration * 1000, 3),
+        'attributes': attributes
+    })
+
+
+def _export(spans):
+    lines = ''.join(json.dumps(span) + '\n' for span in spans)
+    with _export_lock:
+        with open(Config.TRACE_EXPORT_PATH, 'a') as f:
+            f.write(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('span_start', []).append((time.time(), time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    wall_start, start = conn.info['span_start'].pop()
+    add_span('sql', 'db', new_span_id(), wall_start, time.perf_counter() - start,
+             statement=' '.join(statement.split())[:200], executemany=executemany)
+
+
+def init_tracing(app, db):
+    """Accept or mint a request ID per request, and export one server span plus its children"""
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_trace():
+        g.trace_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.parent_span_id = request.headers.get(PARENT_SPAN_HEADER)
+        g.span_id = new_span_id()
+        g.trace_wall_start = time.time()
+        g.trace_start = time.perf_counter()
+
+    @app.after_request
+    def finish_trace(response):
+        if 'trace_id' not in g:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.trace_id
+        if Config.TRACE_EXPORT_PATH:
+            spans = g.get('spans', [])
+            spans.append({
+                'trace_id': g.trace_id,
+                'span_id': g.span_id,
+                'parent_id': g.parent_span_id,
+                'service': Config.SERVICE_NAME,
+                'name': f'{request.method} {request.url_rule.rule if request.url_rule else request.path}',
+                'kind': 'server',
+                'start': g.trace_wall_start,
+                'duration_ms': round((time.perf_counter() - g.trace_start) * 1000, 3),
+                'attributes': {'path': request.full_path.rstrip('?'), 'status': response.status_code}
+            })
+            _export(spans)
+        return response
@@ -3,29 +3,28 @@ from flask_cors import CORS
 from flask_restx import Api, Resource, fields
 from models import db, Restaurant, MenuItem
 from config import Config
+from pagination import pagination_parser, page_model, paginate
+from serializers import serialize_with
+from http_client import service_client
+from metrics import init_metrics
+from tracing import init_tracing
+from health import init_health, wait_for_db
+from cache import TTLCache
+from menu_import import import_menu
+from menu_feed import UPSERT, DELETE, record_changes, changes_since
 import os
-import time
 import requests
 
-def wait_for_db(app, max_retries=10, delay=2):
-    with app.app_context():
-        for i in range(max_retries):
-            try:
-                db.session.execute(db.text('SELECT 1')).scalar()
-                print("Restaurant DB connection successful!")
-                return
-            except Exception as e:
-                print(f"Restaurant DB not ready, retrying in {delay}s... (Attempt {i+1}/{max_retries})")
-                time.sleep(delay)
-        raise Exception("Failed to connect to the Restaurant database after multiple retries.")
-
-
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
 CORS(app)
 
+# Per-worker cache of menu items ('item', id) and restaurant menus ('menu', restaurant_id).
+# Writes invalidate locally; other gunicorn workers converge within MENU_CACHE_TTL.
+menu_cache = TTLCache(maxsize=Config.MENU_CACHE_MAXSIZE, ttl=Config.MENU_CACHE_TTL)
+
 api = Api(app, doc='/api-docs/', version='1.0',
           title='Restaurant Service API',
           description='API for managing restaurants and menus',
@@ -39,12 +38,17 @@ api = Api(app, doc='/api-docs/', version='1.0',
               }
           })
 
+init_metrics(app, api, db)
+init_tracing(app, db)
+init_health(app, db)
+
 restaurant_model = api.model('Restaurant', {
     'id': fields.Integer,
     'name': fields.String,
     'address': fields.String,
     'is_active': fields.Boolean
 })
+restaurant_page_model = page_model(api, 'RestaurantPage', restaurant_model)
 menu_item_model = api.model('MenuItem', {
     'id': fields.Integer,
     'restaurant_id': fields.Integer,
@@ -63,14 +67,16 @@ restaurants_ns = api.namespace('restaurants', description='Restaurant operations
 @restaurants_ns.route('/')
 class RestaurantList(Resource):
     @restaurants_ns.doc('list_restaurants', security='Bearer Auth')
-    @restaurants_ns.marshal_list_with(restaurant_model)
+    @restaurants_ns.expect(pagination_parser)
+    @serialize_with(restaurants_ns, restaurant_page_model)
     def get(self):
-        """List all restaurants"""
-        return [r.to_dict() for r in Restaurant.query.all()]
+        """List restaurants, one keyset page at a time"""
+        args = pagination_parser.parse_args()
+        return paginate(Restaurant.query, Restaurant, args['limit'], args['after'])
 
     @restaurants_ns.doc('create_restaurant', security='Bearer Auth')
     @restaurants_ns.expect(restaurant_model)
-    @restaurants_ns.marshal_with(restaurant_model, code=201)
+    @serialize_with(restaurants_ns, restaurant_model, code=201)
     def post(self):
         """Create a new restaurant"""
         data = request.get_json()
@@ -81,24 +87,24 @@ class RestaurantList(Resource):
         )
         db.session.add(r)
         db.session.commit()
-        return r.to_dict(), 201
+        return r, 201
 
 @restaurants_ns.route('/<int:id>')
 @restaurants_ns.response(404, 'Restaurant not found')
 @restaurants_ns.param('id', 'The restaurant identifier')
 class RestaurantResource(Resource):
     @restaurants_ns.doc('get_restaurant', security='Bearer Auth')
-    @restaurants_ns.marshal_with(restaurant_model)
+    @serialize_with(restaurants_ns, restaurant_model)
     def get(self, id):
         """Get restaurant by ID"""
         restaurant = Restaurant.query.get(id)
         if not restaurant:
             return {'error': 'Restaurant not found'}, 404
-        return restaurant.to_dict()
+        return restaurant
 
     @restaurants_ns.doc('update_restaurant', security='Bearer Auth')
     @restaurants_ns.expect(restaurant_model)
-    @restaurants_ns.marshal_with(restaurant_model)
+    @serialize_with(restaurants_ns, restaurant_model)
     def put(self, id):
         """Update restaurant by ID"""
         restaurant = Restaurant.query.get(id)
@@ -114,7 +120,7 @@ class RestaurantResource(Resource):
             restaurant.is_active = data['is_active']
 
         db.session.commit()
-        return restaurant.to_dict()
+        return restaurant
 
     @restaurants_ns.doc('delete_restaurant', security='Bearer Auth')
     @restaurants_ns.response(200, 'Restaurant deleted successfully')
@@ -124,24 +130,30 @@ class RestaurantResource(Resource):
         if not restaurant:
             return {'error': 'Restaurant not found'}, 404
 
+        items = MenuItem.query.filter_by(restaurant_id=id).all()
+        record_changes(DELETE, items)
         MenuItem.query.filter_by(restaurant_id=id).delete()
         db.session.delete(restaurant)
         db.session.commit()
+        menu_cache.delete(('menu', id), *[('item', item.id) for item in items])
         return {'message': 'Restaurant deleted successfully'}, 200
 
 @restaurants_ns.route('/<int:id>/menu')
 @restaurants_ns.param('id', 'The restaurant identifier')
 class RestaurantMenu(Resource):
     @restaurants_ns.doc('list_menu_items', security='Bearer Auth')
-    @restaurants_ns.marshal_list_with(menu_item_model)
+    @serialize_with(restaurants_ns, menu_item_model, as_list=True)
     def get(self, id):
         """Get all menu items for a restaurant"""
-        items = MenuItem.query.filter_by(restaurant_id=id).all()
-        return [item.to_dict() for item in items]
+        menu = menu_cache.get(('menu', id))
+        if menu is None:
+            menu = [item.to_dict() for item in MenuItem.query.filter_by(restaurant_id=id).all()]
+            menu_cache.set(('menu', id), menu)
+        return menu
 
     @restaurants_ns.doc('create_menu_item', security='Bearer Auth')
     @restaurants_ns.expect(menu_item_input_model)
-    @restaurants_ns.marshal_with(menu_item_model, code=201)
+    @serialize_with(restaurants_ns, menu_item_model, code=201)
     def post(self, id):
         """Create a new menu item for a restaurant"""
         data = request.get_json()
@@ -152,8 +164,34 @@ class RestaurantMenu(Resource):
             price=data['price']
         )
         db.session.add(item)
+        db.session.flush()
+        record_changes(UPSERT, [item])
         db.session.commit()
-        return item.to_dict(), 201
+        menu_cache.delete(('menu', id))
+        return item, 201
+
+@restaurants_ns.route('/<int:id>/menu/import')
+@restaurants_ns.param('id', 'The restaurant identifier')
+@restaurants_ns.response(404, 'Restaurant not found')
+@restaurants_ns.response(415, 'Unsupported content type')
+class RestaurantMenuImport(Resource):
+    @restaurants_ns.doc('import_menu_items', security='Bearer Auth',
+                        description='Stream menu items as NDJSON (application/x-ndjson) or CSV (text/csv) '
+                                    'with name, description and price per row.')
+    def post(self, id):
+        """Bulk import menu items for a restaurant from a streamed NDJSON or CSV body"""
+        if not Restaurant.query.get(id):
+            return {'error': 'Restaurant not found'}, 404
+
+        content_type = request.mimetype or ''
+        if content_type not in ('application/x-ndjson', 'application/jsonl', 'text/csv'):
+            return {'error': 'Content-Type must be application/x-ndjson or text/csv'}, 415
+
+        report = import_menu(id, request.stream, content_type,
+                             batch_size=Config.MENU_IMPORT_BATCH_SIZE,
+                             max_errors=Config.MENU_IMPORT_MAX_ERRORS)
+        menu_cache.delete(('menu', id))
+        return report, 200
 
 @restaurants_ns.route('/<int:restaurant_id>/menu/<int:menu_id>')
 @restaurants_ns.param('restaurant_id', 'The restaurant identifier')
@@ -161,17 +199,17 @@ class RestaurantMenu(Resource):
 @restaurants_ns.response(404, 'Menu item not found')
 class MenuItemResource(Resource):
     @restaurants_ns.doc('get_menu_item', security='Bearer Auth')
-    @restaurants_ns.marshal_with(menu_item_model)
+    @serialize_with(restaurants_ns, menu_item_model)
     def get(self, restaurant_id, menu_id):
         """Get specific menu item"""
         item = MenuItem.query.filter_by(id=menu_id, restaurant_id=restaurant_id).first()
         if not item:
             return {'error': 'Menu item not found'}, 404
-        return item.to_dict()
+        return item
 
     @restaurants_ns.doc('update_menu_item', security='Bearer Auth')
     @restaurants_ns.expect(menu_item_input_model)
-    @restaurants_ns.marshal_with(menu_item_model)
+    @serialize_with(restaurants_ns, menu_item_model)
     def put(self, restaurant_id, menu_id):
         """Update menu item"""
         item = MenuItem.query.filter_by(id=menu_id, restaurant_id=restaurant_id).first()
@@ -186,8 +224,10 @@ class MenuItemResource(Resource):
         if 'price' in data:
             item.price = data['price']
 
+        record_changes(UPSERT, [item])
         db.session.commit()
-        return item.to_dict()
+        menu_cache.delete(('item', menu_id), ('menu', restaurant_id))
+        return item
 
     @restaurants_ns.doc('delete_menu_item', security='Bearer Auth')
     @restaurants_ns.response(200, 'Menu item deleted successfully')
@@ -197,34 +237,93 @@ class MenuItemResource(Resource):
         if not item:
             return {'error': 'Menu item not found'}, 404
 
+        record_changes(DELETE, [item])
         db.session.delete(item)
         db.session.commit()
+        menu_cache.delete(('item', menu_id), ('menu', restaurant_id))
         return {'message': 'Menu item deleted successfully'}, 200
 
+@app.route('/internal/menu-items')
+def get_menu_items_internal():
+    """Internal endpoint to get several menu items in one query (?ids=1,2,3)"""
+    raw_ids = request.args.get('ids', '')
+    try:
+        item_ids = {int(i) for i in raw_ids.split(',') if i.strip()}
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+
+    if not item_ids:
+        return jsonify({'error': 'ids query parameter is required'}), 400
+    if len(item_ids) > Config.MENU_ITEMS_BATCH_LIMIT:
+        return jsonify({'error': f'At most {Config.MENU_ITEMS_BATCH_LIMIT} ids per request'}), 400
+
+    found = []
+    missing = []
+    for item_id in item_ids:
+        cached = menu_cache.get(('item', item_id))
+        if cached is None:
+            missing.append(item_id)
+        else:
+            found.append(cached)
+
+    if missing:
+        for item in MenuItem.query.filter(MenuItem.id.in_(missing)).all():
+            item_dict = item.to_dict()
+            menu_cache.set(('item', item.id), item_dict)
+            found.append(item_dict)
+    return jsonify(found)
+
+@app.route('/internal/menu-items/changes')
+def get_menu_item_changes_internal():
+    """Internal change feed: menu item upserts/deletes after ?since=<version>, oldest first"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', Config.MENU_FEED_PAGE_SIZE)), Config.MENU_FEED_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    if since < 0 or limit < 1:
+        return jsonify({'error': 'since must be >= 0 and limit >= 1'}), 400
+
+    changes = changes_since(since, limit)
+    return jsonify({
+        'changes': [change.to_dict() for change in changes],
+        'next_since': changes[-1].version if changes else since,
+        'has_more': len(changes) == limit
+    })
+
 @app.route('/internal/menu-items/<int:item_id>')
 def get_menu_item_internal(item_id):
     """Internal endpoint to get menu item details"""
-    item = MenuItem.query.get(item_id)
-    if not item:
-        return jsonify({'error': 'Menu item not found'}), 404
-    return jsonify(item.to_dict())
+    item_dict = menu_cache.get(('item', item_id))
+    if item_dict is None:
+        item = MenuItem.query.get(item_id)
+        if not item:
+            return jsonify({'error': 'Menu item not found'}), 404
+        item_dict = item.to_dict()
+        menu_cache.set(('item', item_id), item_dict)
+    return jsonify(item_dict)
+
+@app.route('/internal/cache/stats')
+def cache_stats():
+    """Internal endpoint exposing menu cache size and hit/miss counters for this worker"""
+    return jsonify(menu_cache.stats())
 
 @app.route('/health')
 def health_check():
     return jsonify({'status': 'healthy', 'service': os.getenv('SERVICE_NAME')})
 
 if __name__ == '__main__':
-    wait_for_db(app) 
+    from migrations import run_migrations
+    wait_for_db(app, db)
+    run_migrations(app)
     
     with app.app_context():
-        db.create_all()
-        
         if not Restaurant.query.first():
             print("No restaurants found, creating sample data...")
             
             try:
                 user_url = f"{Config.USER_SERVICE_URL}/internal/users/1"
-                user_res = requests.get(user_url)
+                user_res = service_client.get(user_url)
                 
                 if user_res.status_code == 200:
                     admin_name = user_res.json().get('username')
@@ -245,6 +344,8 @@ if __name__ == '__main__':
                 price=15.99
             )
             db.session.add(m1)
+            db.session.flush()
+            record_changes(UPSERT, [m1])
             db.session.commit()
 
             print(f"Sample restaurant created. Use menu_item_id: {m1.id} for testing.")
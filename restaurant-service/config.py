@@ -7,6 +7,26 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
     PORT = int(os.getenv('PORT', 3002))
     SERVICE_NAME = os.getenv('SERVICE_NAME', 'restaurant-service')
-    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL', 'http://user-service:3001')
\ No newline at end of file
+    USER_SERVICE_URL = os.getenv('USER_SERVICE_URL', 'http://user-service:3001')
+    MENU_ITEMS_BATCH_LIMIT = int(os.getenv('MENU_ITEMS_BATCH_LIMIT', 200))
+    MENU_CACHE_MAXSIZE = int(os.getenv('MENU_CACHE_MAXSIZE', 2048))
+    MENU_CACHE_TTL = float(os.getenv('MENU_CACHE_TTL', 30))
+    MENU_IMPORT_BATCH_SIZE = int(os.getenv('MENU_IMPORT_BATCH_SIZE', 500))
+    MENU_IMPORT_MAX_ERRORS = int(os.getenv('MENU_IMPORT_MAX_ERRORS', 1000))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 2))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 5))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.2))
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+    TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH')
+    HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', 5))
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 1))
+    STARTUP_DB_TIMEOUT = float(os.getenv('STARTUP_DB_TIMEOUT', 120))
+    MENU_FEED_PAGE_SIZE = int(os.getenv('MENU_FEED_PAGE_SIZE', 500))
\ No newline at end of file
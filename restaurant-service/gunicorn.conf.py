@@ -1,6 +1,17 @@
-import time
-from app import app, db, wait_for_db
+import os
+import shutil
+
+# Must be set before prometheus_client is imported so every worker writes to shared files
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from prometheus_client import multiprocess
+from migrations import run_migrations
+from app import app, db
+from health import wait_for_db
 from models import Restaurant, MenuItem
+from menu_feed import UPSERT, record_changes
 
 workers = 2
 worker_class = 'sync'
@@ -10,17 +21,16 @@ keepalive = 5
 graceful_timeout = 30
 
 accesslog = '-'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" request_id=%({x-request-id}o)s'
 errorlog = '-'
 loglevel = 'debug'
 
 def on_starting(server):
     print("--- [Gunicorn] Running DB Initializer for Restaurant Service ---")
-    wait_for_db(app)
+    wait_for_db(app, db)
+    run_migrations(app)
 
     with app.app_context():
-        print("[Gunicorn] Creating all tables...")
-        db.create_all()
-
         if not Restaurant.query.first():
             print("[Gunicorn] No restaurants found, creating sample data...")
             r1 = Restaurant(name='Pizza Zone', address='123 Main St')
@@ -34,9 +44,14 @@ def on_starting(server):
                 price=15.99
             )
             db.session.add(m1)
+            db.session.flush()
+            record_changes(UPSERT, [m1])
             db.session.commit()
             print("[Gunicorn] Sample data created.")
         else:
             print("[Gunicorn] Restaurant data already exists.")
 
-    print("--- [Gunicorn] DB Initializer Complete ---")
\ No newline at end of file
+    print("--- [Gunicorn] DB Initializer Complete ---")
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
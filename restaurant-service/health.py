@@ -0,0 +1,100 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify
+from config import Config
+from http_client import create_session
+
+# Probes must fail within HEALTH_CHECK_TIMEOUT, so they get their own session without retries
+probe_client = create_session(Config, retries=0, record_metrics=False)
+_refresh_lock = threading.Lock()
+_ready_cache = {'checked_at': 0.0, 'result': None}
+
+
+def wait_for_db(app, db, timeout=None, base_delay=0.5, max_delay=10):
+    """Block until the database answers, backing off exponentially with full jitter"""
+    deadline = time.monotonic() + (timeout or Config.STARTUP_DB_TIMEOUT)
+    attempt = 0
+    with app.app_context():
+        while True:
+            attempt += 1
+            try:
+                db.session.execute(db.text('SELECT 1')).scalar()
+                print("Database connection successful!")
+                return
+            except Exception as e:
+                db.session.remove()
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                if time.monotonic() + delay > deadline:
+                    raise Exception(f"Failed to connect to the database after {attempt} attempts: {e}")
+                print(f"Database not ready, retrying in {delay:.1f}s... (Attempt {attempt})")
+                time.sleep(delay)
+
+
+def _probe(base_url):
+    try:
+        response = probe_client.get(f'{base_url}/health/live', timeout=Config.HEALTH_CHECK_TIMEOUT)
+        return 'ok' if response.status_code == 200 else f'error: HTTP {response.status_code}'
+    except Exception as e:
+        return f'error: {e.__class__.__name__}'
+
+
+def _run_checks(db, dependencies):
+    """Probe downstream services concurrently while the databases are checked"""
+    dependencies = dependencies or {}
+    checks = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(dependencies))) as pool:
+        probes = {name: pool.submit(_probe, base_url) for name, base_url in dependencies.items()}
+        for bind, engine in db.engines.items():
+            name = 'database' if bind is None else f'database:{bind}'
+            try:
+                with engine.connect() as conn:
+                    conn.execute(db.text('SELECT 1'))
+                checks[name] = 'ok'
+            except Exception as e:
+                checks[name] = f'error: {e.__class__.__name__}'
+        for name, probe in probes.items():
+            checks[name] = probe.result()
+    return checks
+
+
+def _is_fresh():
+    return (_ready_cache['result'] is not None
+            and time.monotonic() - _ready_cache['checked_at'] < Config.HEALTH_CACHE_TTL)
+
+
+def readiness(db, dependencies=None):
+    """
+    Dependency check results, recomputed at most once per HEALTH_CACHE_TTL seconds per process.
+
+    One request refreshes them; meanwhile the others get the previous result
+    instead of queueing (only the very first check is waited for).
+    """
+    if not _is_fresh() and _refresh_lock.acquire(blocking=_ready_cache['result'] is None):
+        try:
+            if not _is_fresh():
+                checked_at = time.monotonic()
+                _ready_cache['result'] = _run_checks(db, dependencies)
+                _ready_cache['checked_at'] = checked_at
+        finally:
+            _refresh_lock.release()
+    return _ready_cache['result']
+
+
+def init_health(app, db, dependencies=None):
+    """
+    Register /health/live (process is up) and /health/ready (database and,
+    if given, downstream services reachable) for container probes.
+    """
+    def live():
+        return jsonify({'status': 'alive', 'service': Config.SERVICE_NAME})
+
+    def ready():
+        checks = readiness(db, dependencies)
+        ok = all(result == 'ok' for result in checks.values())
+        body = {'status': 'ready' if ok else 'not_ready', 'service': Config.SERVICE_NAME, 'checks': checks}
+        return jsonify(body), 200 if ok else 503
+
+    app.add_url_rule('/health/live', 'health_live', live)
+    app.add_url_rule('/health/ready', 'health_ready', ready)
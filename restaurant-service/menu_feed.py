@@ -0,0 +1,62 @@
+"""
+Change feed of menu item inserts, updates and deletes.
+
+Every write path records one menu_item_change row per affected item, in the
+same transaction, holding the item as it is after the change (or only its
+ids for a delete). Versions come from the single-row menu_feed_version
+counter: incrementing it locks the row until commit, so versions become
+visible strictly in order and a reader polling with ?since=<last version>
+can never skip a change that commits late. The price is that menu writes are
+serialized, which is fine for how rarely menus change.
+
+Consumers (order-service's menu_sync.py) replay the feed from version 0 to
+build a full copy, then follow it with the cursor.
+"""
+import sqlalchemy as sa
+from models import db, MenuItemChange, MenuFeedVersion
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+
+def _allocate_versions(count):
+    """Reserve count consecutive versions, returning the first one"""
+    table = MenuFeedVersion.__table__
+    db.session.execute(sa.update(table).where(table.c.id == 1).values(version=table.c.version + count))
+    last = db.session.execute(sa.select(table.c.version).where(table.c.id == 1)).scalar_one()
+    return last - count + 1
+
+
+def lock_feed():
+    """Take the counter lock up front: no other menu write can commit until this transaction does"""
+    table = MenuFeedVersion.__table__
+    db.session.execute(sa.update(table).where(table.c.id == 1).values(version=table.c.version))
+
+
+def record_changes(op, items):
+    """Append one change per MenuItem to the feed; call after flush, before commit"""
+    items = list(items)
+    if not items:
+        return
+    first = _allocate_versions(len(items))
+    db.session.execute(sa.insert(MenuItemChange.__table__), [
+        {
+            'version': first + offset,
+            'menu_item_id': item.id,
+            'restaurant_id': item.restaurant_id,
+            'op': op,
+            'name': item.name if op == UPSERT else None,
+            'description': item.description if op == UPSERT else None,
+            'price': item.price if op == UPSERT else None
+        }
+        for offset, item in enumerate(items)
+    ])
+
+
+def changes_since(version, limit):
+    """Up to limit changes after version, oldest first"""
+    return (MenuItemChange.query
+            .filter(MenuItemChange.version > version)
+            .order_by(MenuItemChange.version)
+            .limit(limit)
+            .all())
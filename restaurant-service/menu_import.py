@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import math
+from models import db, MenuItem
+from menu_feed import UPSERT, lock_feed, record_changes
+
+
+def iter_rows(stream, content_type):
+    """
+    Yield (row_number, row_or_error) from an NDJSON or CSV body without buffering it.
+
+    Bytes that are not valid UTF-8 are kept as surrogate escapes, so only the
+    rows containing them fail (in validate_row) instead of the whole upload.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='surrogateescape', newline='')
+    if content_type.startswith('text/csv'):
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f'Invalid JSON: {e.msg}')
+
+
+def _check_utf8(field, value):
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        raise ValueError(f'{field} is not valid UTF-8')
+
+
+def validate_row(row):
+    """Return the MenuItem column values for one row, or raise ValueError"""
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise ValueError('name is required')
+    _check_utf8('name', name)
+    if len(name) > 100:
+        raise ValueError('name must be at most 100 characters')
+
+    description = row.get('description') or None
+    if description is not None:
+        _check_utf8('description', description)
+        if len(description) > 255:
+            raise ValueError('description must be at most 255 characters')
+
+    try:
+        price = float(row.get('price'))
+    except (TypeError, ValueError):
+        raise ValueError('price must be a number')
+    if not math.isfinite(price) or price < 0:
+        raise ValueError('price must be a non-negative number')
+
+    return {'name': name, 'description': description, 'price': price}
+
+
+def import_menu(restaurant_id, stream, content_type, batch_size, max_errors):
+    """
+    Insert valid rows in executemany batches inside one transaction.
+
+    Only one batch and at most max_errors error entries are held in memory,
+    so memory stays bounded whatever the size of the upload.
+    """
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+    last_id = 0
+
+    def flush():
+        nonlocal last_id
+        if batch:
+            db.session.execute(db.insert(MenuItem), batch)
+            batch.clear()
+            # executemany returns no ids; lock_feed() keeps other writers from committing rows above last_id
+            inserted = db.session.execute(
+                db.select(MenuItem.id, MenuItem.restaurant_id, MenuItem.name, MenuItem.description, MenuItem.price)
+                .where(MenuItem.restaurant_id == restaurant_id, MenuItem.id > last_id)
+                .order_by(MenuItem.id)
+            ).all()
+            record_changes(UPSERT, inserted)
+            last_id = inserted[-1].id
+
+    try:
+        # Lock before reading the max id, so the re-select in flush() sees only this import's rows
+        # under any isolation level
+        lock_feed()
+        last_id = db.session.execute(db.select(db.func.max(MenuItem.id))).scalar() or 0
+        for row_number, row in iter_rows(stream, content_type):
+            try:
+                values = validate_row(row)
+            except ValueError as e:
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append({'row': row_number, 'error': str(e)})
+                continue
+
+            batch.append({'restaurant_id': restaurant_id, **values})
+            imported += 1
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'errors_truncated': failed > len(errors)
+    }
@@ -0,0 +1,141 @@
+"""
+Versioned schema migrations for the Restaurant Service.
+
+Each migration runs once, in version order, inside its own transaction and is
+recorded in the schema_migrations table. Migration 1 is the baseline: it
+creates the tables db.create_all() used to create and skips any that already
+exist, so databases created before migrations existed upgrade in place.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending migrations
+"""
+import sys
+from datetime import datetime
+import sqlalchemy as sa
+from models import db
+
+MIGRATIONS = []
+
+schema_migrations = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('description', sa.String(255), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def create_index_if_missing(conn, table, name, *columns, unique=False):
+    """Create an index unless one already leads with its columns (e.g. MySQL's FK index)"""
+    for existing in sa.inspect(conn).get_indexes(table):
+        if existing['name'] == name or existing['column_names'][:len(columns)] == list(columns):
+            return
+    target = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    sa.Index(name, *(target.c[column] for column in columns), unique=unique).create(conn)
+
+
+# Every migration declares the tables it creates as they were at that version,
+# never through models.py, so replaying history always yields the same schema.
+
+@migration(1, 'baseline: restaurant and menu_item tables')
+def baseline(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'restaurant', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('address', sa.String(255), nullable=False),
+        sa.Column('is_active', sa.Boolean, nullable=False)
+    )
+    sa.Table(
+        'menu_item', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('restaurant_id', sa.Integer, sa.ForeignKey('restaurant.id'), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('description', sa.String(255)),
+        sa.Column('price', sa.Float, nullable=False)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, 'index menu_item.restaurant_id')
+def index_menu_items(conn):
+    create_index_if_missing(conn, 'menu_item', 'ix_menu_item_restaurant_id', 'restaurant_id')
+
+
+@migration(3, 'menu item change feed, seeded with every existing item')
+def menu_feed(conn):
+    metadata = sa.MetaData()
+    changes = sa.Table(
+        'menu_item_change', metadata,
+        sa.Column('version', sa.BigInteger, primary_key=True, autoincrement=False),
+        sa.Column('menu_item_id', sa.Integer, nullable=False),
+        sa.Column('restaurant_id', sa.Integer, nullable=False),
+        sa.Column('op', sa.String(10), nullable=False),
+        sa.Column('name', sa.String(100)),
+        sa.Column('description', sa.String(255)),
+        sa.Column('price', sa.Float),
+        sa.Column('changed_at', sa.DateTime, nullable=False)
+    )
+    feed_version = sa.Table(
+        'menu_feed_version', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('version', sa.BigInteger, nullable=False)
+    )
+    metadata.create_all(conn, checkfirst=True)
+    items = sa.table(
+        'menu_item', sa.column('id'), sa.column('restaurant_id'),
+        sa.column('name'), sa.column('description'), sa.column('price')
+    )
+    # Existing items enter the feed as upserts; their ids are increasing, so they double as versions
+    conn.execute(sa.insert(changes).from_select(
+        ['version', 'menu_item_id', 'restaurant_id', 'op', 'name', 'description', 'price', 'changed_at'],
+        sa.select(items.c.id, items.c.id, items.c.restaurant_id, sa.literal('upsert'),
+                  items.c.name, items.c.description, items.c.price, sa.literal(datetime.utcnow()))
+    ))
+    last = conn.execute(sa.select(sa.func.max(items.c.id))).scalar() or 0
+    conn.execute(sa.insert(feed_version).values(id=1, version=last))
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(sa.select(schema_migrations.c.version))}
+
+
+def run_migrations(app):
+    """Apply pending migrations; a single version lookup when the schema is current"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            print(f"[Migrations] Applying {version}: {description}")
+            with db.engine.begin() as conn:
+                fn(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+
+
+def print_status(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{'applied' if version in applied else 'pending':<8} {version:>3}  {description}")
+
+
+if __name__ == '__main__':
+    from app import app
+    if '--status' in sys.argv:
+        print_status(app)
+    else:
+        run_migrations(app)
@@ -1,7 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Restaurant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,7 +21,7 @@ class Restaurant(db.Model):
 
 class MenuItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255))
     price = db.Column(db.Float, nullable=False)
@@ -32,4 +33,31 @@ class MenuItem(db.Model):
             'name': self.name,
             'description': self.description,
             'price': self.price
-        }
\ No newline at end of file
+        }
+
+class MenuItemChange(db.Model):
+    """Append-only change feed of menu items; versions are handed out in commit order by menu_feed.py"""
+    version = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    menu_item_id = db.Column(db.Integer, nullable=False)
+    restaurant_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    name = db.Column(db.String(100))
+    description = db.Column(db.String(255))
+    price = db.Column(db.Float)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'menu_item_id': self.menu_item_id,
+            'restaurant_id': self.restaurant_id,
+            'op': self.op,
+            'name': self.name,
+            'description': self.description,
+            'price': self.price
+        }
+
+class MenuFeedVersion(db.Model):
+    """Single-row counter holding the latest menu_item_change version"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Fixtures for the regression tests.
+
+Services are loaded with benchmarks/harness.py, each in isolation on a
+SQLite database in pytest's tmp_path.
+"""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+import harness  # noqa: E402
+
+
+@pytest.fixture
+def load_service(tmp_path):
+    """load_service(name, env=None, extra_modules=()) -> {module_name: module}, with the service's migrations applied"""
+    def load(name, env=None, extra_modules=()):
+        # timeout= is the SQLite busy timeout, needed once several threads write at once
+        database_url = f"sqlite:///{tmp_path / name.replace('-', '_')}.db?timeout=30"
+        modules = harness.load_service(name, database_url, env, extra_modules)
+        modules['migrations'].run_migrations(modules['app'].app)
+        return modules
+    return load
+
+
+class SeededCluster(harness.Cluster):
+    """All four services with one user (balance 100) and one restaurant with a 30.00 menu item"""
+
+    def __init__(self, workdir):
+        super().__init__(workdir, env={'BCRYPT_POOL_SIZE': '0'})
+        user_models = self.models('user-service')
+        with self.app('user-service').app_context():
+            user = user_models.User(username='test-user', name='Test User', password_hash='x', balance=100.0)
+            user_models.db.session.add(user)
+            user_models.db.session.commit()
+            self.user_id = user.id
+
+        restaurant_models = self.models('restaurant-service')
+        with self.app('restaurant-service').app_context():
+            restaurant = restaurant_models.Restaurant(name='Test Kitchen', address='Jl. Test 1')
+            restaurant_models.db.session.add(restaurant)
+            restaurant_models.db.session.flush()
+            item = restaurant_models.MenuItem(restaurant_id=restaurant.id, name='Nasi Goreng', price=30.0)
+            restaurant_models.db.session.add(item)
+            restaurant_models.db.session.commit()
+            self.restaurant_id, self.menu_item_id = restaurant.id, item.id
+
+    @contextmanager
+    def served_by(self, caller, service, app):
+        """Route caller's calls to service to another WSGI app (None: unreachable) for the block"""
+        apps = self.modules[caller]['http_client'].service_client.get_adapter('http://x').apps
+        host = urlsplit(harness.SERVICES[service]).netloc
+        original = apps.pop(host)
+        if app is not None:
+            apps[host] = app
+        try:
+            yield
+        finally:
+            apps[host] = original
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    return SeededCluster(tmp_path)
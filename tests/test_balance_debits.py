@@ -0,0 +1,76 @@
+"""Concurrent debits against one account must neither lose updates nor overdraw it."""
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+
+@pytest.fixture
+def user_service(load_service):
+    modules = load_service('user-service')
+    app, models = modules['app'].app, modules['models']
+    with app.app_context():
+        user = models.User(username='debit-test', name='Debit Test', password_hash='x', balance=100.0)
+        models.db.session.add(user)
+        models.db.session.commit()
+        return app, user.id
+
+
+def test_parallel_debits_never_overdraw(user_service):
+    app, user_id = user_service
+    url = f'/internal/users/{user_id}/balance'
+
+    def debit(_):
+        return app.test_client().put(url, json={'type': 'debit', 'amount': 7}).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = list(pool.map(debit, range(30)))
+
+    assert codes.count(200) == 14
+    assert codes.count(400) == 16
+    assert app.test_client().get(f'/internal/users/{user_id}').get_json()['balance'] == pytest.approx(2.0)
+
+
+def test_debit_after_credit_uses_credited_funds(user_service):
+    app, user_id = user_service
+    client = app.test_client()
+    url = f'/internal/users/{user_id}/balance'
+
+    assert client.put(url, json={'type': 'debit', 'amount': 150}).status_code == 400
+    response = client.put(url, json={'type': 'credit', 'amount': 50})
+    assert response.status_code == 200
+    assert response.get_json()['balance'] == pytest.approx(150.0)
+    response = client.put(url, json={'type': 'debit', 'amount': 150})
+    assert response.status_code == 200
+    assert response.get_json()['balance'] == pytest.approx(0.0)
+
+
+def ledger_entries(app, models, user_id):
+    with app.app_context():
+        return [(entry.entry_type, entry.amount, entry.reference)
+                for entry in models.BalanceLedger.query.filter_by(user_id=user_id).order_by(models.BalanceLedger.id)]
+
+
+def test_retried_changes_are_applied_and_recorded_once(load_service):
+    modules = load_service('user-service')
+    app, models = modules['app'].app, modules['models']
+    with app.app_context():
+        user = models.User(username='ledger-test', name='Ledger Test', password_hash='x', balance=100.0)
+        models.db.session.add(user)
+        models.db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    url = f'/internal/users/{user_id}/balance'
+    for _ in range(2):
+        assert client.put(url, json={'type': 'debit', 'amount': 30, 'reference': 'order-1'}).status_code == 200
+    for _ in range(2):
+        response = client.put(url, json={'type': 'credit', 'amount': 30, 'reference': 'order-1'})
+        assert response.status_code == 200
+
+    assert response.get_json()['balance'] == pytest.approx(100.0)
+    assert ledger_entries(app, models, user_id) == [('debit', -30.0, 'order-1'), ('credit', 30.0, 'order-1')]
+    # An overdraft attempt leaves no trace in the ledger
+    assert client.put(url, json={'type': 'debit', 'amount': 500, 'reference': 'order-2'}).status_code == 400
+    assert len(ledger_entries(app, models, user_id)) == 2
+
+    assert client.delete(f'/users/{user_id}').status_code == 200
+    assert ledger_entries(app, models, user_id) == []
@@ -0,0 +1,31 @@
+"""Concurrent lookups report their phase timings without racing on g.phase_times."""
+import threading
+import pytest
+from flask import g
+
+
+def test_gather_merges_each_lookups_phase_times(load_service):
+    modules = load_service('order-service', extra_modules=('fanout',))
+    fanout, metrics = modules['fanout'], modules['metrics']
+    both_running = threading.Barrier(2, timeout=5)
+
+    def lookup(phase):
+        both_running.wait()
+        for _ in range(1000):
+            metrics.add_phase_time(phase, 0.001)
+            metrics.add_phase_time('http:shared', 0.001)
+        both_running.wait()
+        # Nothing reaches the request's timings until gather() merges them on its own thread
+        return dict(g.phase_times)
+
+    with modules['app'].app.test_request_context('/orders/'):
+        metrics.add_phase_time('sql', 0.5)
+        results = fanout.gather(lambda: lookup('http:user-service'), lambda: lookup('http:restaurant-service'))
+
+        assert results == [{'sql': 0.5}, {'sql': 0.5}]
+        assert g.phase_times == {
+            'sql': 0.5,
+            'http:user-service': pytest.approx(1.0),
+            'http:restaurant-service': pytest.approx(1.0),
+            'http:shared': pytest.approx(2.0)
+        }
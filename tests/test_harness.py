@@ -0,0 +1,10 @@
+"""Environment overrides given to the harness apply to the loaded service only."""
+import os
+
+
+def test_env_overrides_do_not_leak(load_service):
+    before = dict(os.environ)
+    modules = load_service('user-service', {'PAGE_SIZE_MAX': '5'})
+
+    assert modules['config'].Config.PAGE_SIZE_MAX == 5
+    assert dict(os.environ) == before
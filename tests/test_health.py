@@ -0,0 +1,24 @@
+"""Readiness probes call other services without counting as downstream traffic."""
+
+
+def downstream_samples(cluster, name):
+    registry = cluster.modules[name]['metrics'].registry
+    return [sample for metric in registry.collect()
+            if metric.name == 'downstream_request_duration_seconds'
+            for sample in metric.samples if sample.name.endswith('_count')]
+
+
+def test_readiness_probes_are_not_recorded_as_downstream_calls(cluster):
+    response = cluster.client('order-service').get('/health/ready')
+
+    assert response.status_code == 200
+    assert downstream_samples(cluster, 'order-service') == []
+
+
+def test_service_calls_are_still_recorded(cluster):
+    cluster.client('order-service').post('/orders/', json={
+        'user_id': cluster.user_id, 'restaurant_id': cluster.restaurant_id,
+        'items': [{'menu_item_id': cluster.menu_item_id, 'quantity': 1}]})
+
+    services = {sample.labels['service'] for sample in downstream_samples(cluster, 'order-service')}
+    assert {'user-service', 'payment-service'} <= services
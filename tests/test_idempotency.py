@@ -0,0 +1,49 @@
+"""A key left IN_PROGRESS by a crashed worker only blocks retries until its lease runs out."""
+from datetime import datetime, timedelta
+
+REQUEST_KEY = 'order-1'
+
+
+def crash_after_claiming(cluster, request):
+    """Claim the key the way the handler would, then never complete or release it"""
+    idempotency = cluster.modules['payment-service']['idempotency']
+    with cluster.app('payment-service').test_request_context(
+            '/internal/process', method='POST', json=request, headers={'Idempotency-Key': REQUEST_KEY}):
+        assert idempotency._begin(f'process-payment:{REQUEST_KEY}', idempotency._request_hash()) is None
+    return idempotency
+
+
+def test_retry_waits_while_the_lease_is_held(cluster):
+    request = {'user_id': cluster.user_id, 'order_id': 1, 'amount': 30.0}
+    crash_after_claiming(cluster, request)
+
+    response = cluster.client('payment-service').post(
+        '/internal/process', json=request, headers={'Idempotency-Key': REQUEST_KEY})
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_retry_takes_over_a_stale_in_progress_key(cluster, monkeypatch):
+    request = {'user_id': cluster.user_id, 'order_id': 1, 'amount': 30.0}
+    idempotency = crash_after_claiming(cluster, request)
+    lease = idempotency.Config.IDEMPOTENCY_LEASE
+
+    class AfterLease(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(seconds=lease + 1)
+
+    monkeypatch.setattr(idempotency, 'datetime', AfterLease)
+    payment = cluster.client('payment-service')
+    response = payment.post('/internal/process', json=request, headers={'Idempotency-Key': REQUEST_KEY})
+    replay = payment.post('/internal/process', json=request, headers={'Idempotency-Key': REQUEST_KEY})
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'SUCCESS'
+    assert replay.headers.get('Idempotent-Replayed') == 'true'
+    models = cluster.models('payment-service')
+    with cluster.app('payment-service').app_context():
+        record = models.db.session.get(models.IdempotencyKey, f'process-payment:{REQUEST_KEY}')
+        assert record.status == 'COMPLETED'
+        # Completing the request swaps the short lease for the full TTL
+        assert record.expires_at > datetime.utcnow() + timedelta(hours=23)
@@ -0,0 +1,42 @@
+"""A menu import reports rows that are not valid UTF-8 instead of failing the whole upload."""
+import pytest
+
+
+@pytest.fixture
+def restaurant_service(load_service):
+    modules = load_service('restaurant-service')
+    app, models = modules['app'].app, modules['models']
+    with app.app_context():
+        restaurant = models.Restaurant(name='Import Test', address='Jl. Test 1')
+        models.db.session.add(restaurant)
+        models.db.session.commit()
+        return app, models, restaurant.id
+
+
+@pytest.mark.parametrize('content_type, body', [
+    ('application/x-ndjson',
+     b'{"name": "Nasi Goreng", "price": 25000}\n'
+     b'{"name": "Es \xff Teh", "price": 5000}\n'
+     b'{"name": "Sate", "price": 30000}\n'),
+    ('text/csv',
+     b'name,description,price\n'
+     b'Nasi Goreng,,25000\n'
+     b'Es Teh,\xe9\xe9,5000\n'
+     b'Sate,,30000\n'),
+])
+def test_invalid_utf8_fails_only_its_row(restaurant_service, content_type, body):
+    app, models, restaurant_id = restaurant_service
+    response = app.test_client().post(f'/restaurants/{restaurant_id}/menu/import', data=body,
+                                      headers={'Content-Type': content_type})
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert report['failed'] == 1
+    assert report['errors'][0]['row'] == 2
+    assert 'not valid UTF-8' in report['errors'][0]['error']
+    with app.app_context():
+        names = {item.name for item in models.MenuItem.query.filter_by(restaurant_id=restaurant_id)}
+        changes = models.MenuItemChange.query.filter_by(restaurant_id=restaurant_id).count()
+    assert names == {'Nasi Goreng', 'Sate'}
+    assert changes == 2
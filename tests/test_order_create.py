@@ -0,0 +1,45 @@
+"""Malformed order items and non-JSON downstream errors are answered with 400, never an unhandled 500."""
+from flask import Flask
+import pytest
+
+
+def order_body(cluster, items):
+    return {'user_id': cluster.user_id, 'restaurant_id': cluster.restaurant_id, 'items': items}
+
+
+@pytest.mark.parametrize('items', [
+    [{'quantity': 1}],
+    [{'menu_item_id': None, 'quantity': 1}],
+    [{'menu_item_id': '1', 'quantity': 1}],
+    [],
+    None,
+])
+def test_items_without_an_integer_menu_item_id_are_rejected(cluster, items):
+    response = cluster.client('order-service').post('/orders/', json=order_body(cluster, items))
+
+    assert response.status_code == 400
+
+
+def test_non_json_menu_lookup_error_is_reported(cluster):
+    broken = Flask('broken-restaurant')
+    broken.add_url_rule('/internal/menu-items', 'menu_items', lambda: ('<html>Bad Gateway</html>', 502))
+    items = [{'menu_item_id': cluster.menu_item_id, 'quantity': 1}]
+
+    with cluster.served_by('order-service', 'restaurant-service', broken):
+        response = cluster.client('order-service').post('/orders/', json=order_body(cluster, items))
+
+    assert response.status_code == 400
+
+
+def test_non_json_payment_error_fails_the_order(cluster):
+    broken = Flask('broken-payment')
+    broken.add_url_rule('/internal/process', 'process', lambda: ('Forbidden', 403), methods=['POST'])
+    items = [{'menu_item_id': cluster.menu_item_id, 'quantity': 1}]
+
+    with cluster.served_by('order-service', 'payment-service', broken):
+        response = cluster.client('order-service').post('/orders/', json=order_body(cluster, items))
+
+    assert response.status_code == 400
+    order_models = cluster.models('order-service')
+    with cluster.app('order-service').app_context():
+        assert [order.status for order in order_models.Order.query] == ['FAILED']
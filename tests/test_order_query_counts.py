@@ -0,0 +1,45 @@
+"""GET /orders/ and GET /orders/<id> must issue a fixed number of SQL statements, however many orders and items exist."""
+from sqlalchemy import event
+
+
+def seed(models, orders, items_per_order):
+    db = models.db
+    for _ in range(orders):
+        order = models.Order(user_id=1, restaurant_id=1, total_price=10.0, status='PAID')
+        db.session.add(order)
+        db.session.flush()
+        for item_id in range(items_per_order):
+            db.session.add(models.OrderItem(order_id=order.id, menu_item_id=item_id + 1, quantity=1, price_at_time=10.0))
+    db.session.commit()
+    return order.id
+
+
+def count_statements(app, engine, path):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = app.test_client().get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_order_reads_do_not_grow_with_data(load_service):
+    modules = load_service('order-service')
+    app, models = modules['app'].app, modules['models']
+
+    with app.app_context():
+        engine = models.db.engine
+        last_id = seed(models, orders=2, items_per_order=1)
+        small = (count_statements(app, engine, '/orders/'), count_statements(app, engine, f'/orders/{last_id}'))
+
+        last_id = seed(models, orders=40, items_per_order=6)
+        large = (count_statements(app, engine, '/orders/'), count_statements(app, engine, f'/orders/{last_id}'))
+
+    assert small == large
+    assert large[0] <= 2 and large[1] <= 2
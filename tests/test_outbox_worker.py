@@ -0,0 +1,111 @@
+"""outbox_worker.run_once against a stubbed payment client."""
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+import requests
+
+
+class StubPaymentClient:
+    """Answers every POST with the next of the given status codes, recording each call"""
+
+    def __init__(self, *codes, delay=0):
+        self.codes = list(codes)
+        self.delay = delay
+        self.calls = []
+        self.started = threading.Event()
+
+    def post(self, url, json=None, headers=None):
+        self.calls.append((url, json, headers))
+        self.started.set()
+        time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = self.codes.pop(0)
+        response._content = b'{"error": "stubbed"}'
+        return response
+
+
+@pytest.fixture
+def outbox(load_service):
+    modules = load_service('order-service', {'OUTBOX_MAX_ATTEMPTS': '2'}, extra_modules=('outbox_worker',))
+    app, models = modules['app'].app, modules['models']
+    with app.app_context():
+        order = models.Order(user_id=1, restaurant_id=1, total_price=30.0, status='PENDING')
+        models.db.session.add(order)
+        models.db.session.flush()
+        models.db.session.add(models.PaymentOutbox(order_id=order.id, user_id=1, amount=30.0))
+        models.db.session.commit()
+    return app, models, modules['outbox_worker']
+
+
+def job_and_order(models):
+    job = models.PaymentOutbox.query.one()
+    return job, models.db.session.get(models.Order, job.order_id)
+
+
+def make_due(models):
+    models.PaymentOutbox.query.update({models.PaymentOutbox.available_at: datetime.utcnow() - timedelta(seconds=1)})
+    models.db.session.commit()
+
+
+def test_successful_payment_marks_the_order_paid(outbox):
+    app, models, worker = outbox
+    client = StubPaymentClient(200)
+    with app.app_context():
+        assert worker.run_once(client) == 1
+        job, order = job_and_order(models)
+        assert (job.status, job.attempts, order.status) == ('DONE', 1, 'PAID')
+    assert client.calls[0][2] == {'Idempotency-Key': f'order-{order.id}'}
+
+
+def test_server_error_is_retried_with_backoff(outbox):
+    app, models, worker = outbox
+    client = StubPaymentClient(503, 200)
+    with app.app_context():
+        assert worker.run_once(client) == 1
+        job, order = job_and_order(models)
+        assert (job.status, job.attempts, order.status) == ('PENDING', 1, 'PENDING')
+        assert job.available_at > datetime.utcnow()
+        # Not due yet: nothing is sent
+        assert worker.run_once(client) == 0
+
+        make_due(models)
+        assert worker.run_once(client) == 1
+        job, order = job_and_order(models)
+        assert (job.status, job.attempts, order.status) == ('DONE', 2, 'PAID')
+    assert len(client.calls) == 2
+
+
+def test_job_fails_after_max_attempts(outbox):
+    app, models, worker = outbox
+    client = StubPaymentClient(503, 503)
+    with app.app_context():
+        worker.run_once(client)
+        make_due(models)
+        worker.run_once(client)
+        job, order = job_and_order(models)
+        assert (job.status, job.attempts, order.status) == ('FAILED', 2, 'FAILED')
+        assert job.last_error == 'stubbed'
+
+
+def test_job_read_by_two_workers_is_processed_once(outbox):
+    app, models, worker = outbox
+    client = StubPaymentClient(200, 200, delay=0.5)
+    results = {}
+
+    def drain(name):
+        with app.app_context():
+            results[name] = worker.run_once(client)
+
+    first = threading.Thread(target=drain, args=('first',))
+    first.start()
+    # The second worker reads the job while the first is still waiting on payment-service
+    assert client.started.wait(5)
+    drain('second')
+    first.join()
+
+    assert results == {'first': 1, 'second': 0}
+    assert len(client.calls) == 1
+    with app.app_context():
+        job, order = job_and_order(models)
+        assert (job.status, job.attempts, order.status) == ('DONE', 1, 'PAID')
@@ -0,0 +1,54 @@
+"""Retrying a payment after a failure charges the order exactly once and never creates a second order."""
+import pytest
+
+
+def balance(cluster):
+    return cluster.client('user-service').get(f'/internal/users/{cluster.user_id}').get_json()['balance']
+
+
+def test_payment_succeeds_on_retry_after_a_failure(cluster):
+    payment = cluster.client('payment-service')
+    request = {'user_id': cluster.user_id, 'order_id': 1, 'amount': 30.0}
+    headers = {'Idempotency-Key': 'order-1'}
+
+    with cluster.served_by('payment-service', 'user-service', None):
+        assert payment.post('/internal/process', json=request, headers=headers).status_code == 500
+
+    response = payment.post('/internal/process', json=request, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'SUCCESS'
+    # A retry under a fresh key (e.g. after the key expired) finds the paid transaction
+    assert payment.post('/internal/process', json=request, headers={'Idempotency-Key': 'late'}).status_code == 200
+    assert balance(cluster) == pytest.approx(70.0)
+
+
+def test_retry_after_a_lost_debit_response_does_not_charge_twice(cluster):
+    # The debit went through but its response never reached payment-service
+    cluster.client('user-service').put(f'/internal/users/{cluster.user_id}/balance',
+                                       json={'type': 'debit', 'amount': 30.0, 'reference': 'order-1'})
+
+    response = cluster.client('payment-service').post(
+        '/internal/process', json={'user_id': cluster.user_id, 'order_id': 1, 'amount': 30.0})
+    assert response.status_code == 200
+    assert balance(cluster) == pytest.approx(70.0)
+
+
+def test_order_whose_payment_is_unknown_goes_to_the_outbox(cluster):
+    orders = cluster.client('order-service')
+    body = {'user_id': cluster.user_id, 'restaurant_id': cluster.restaurant_id,
+            'items': [{'menu_item_id': cluster.menu_item_id, 'quantity': 1}]}
+    headers = {'Idempotency-Key': 'checkout-1'}
+
+    with cluster.served_by('order-service', 'payment-service', None):
+        first = orders.post('/orders/', json=body, headers=headers)
+    retry = orders.post('/orders/', json=body, headers=headers)
+
+    assert first.status_code == 202
+    assert first.get_json()['status'] == 'PENDING'
+    assert retry.status_code == 202
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+    order_models = cluster.models('order-service')
+    with cluster.app('order-service').app_context():
+        assert order_models.Order.query.count() == 1
+        job = order_models.PaymentOutbox.query.one()
+        assert (job.order_id, job.status) == (first.get_json()['id'], 'PENDING')
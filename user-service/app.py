@@ -2,25 +2,19 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_restx import Api, Resource, fields
 from models import db, User, bcrypt
+from ledger import credit, debit, delete_entries
+from password_hashing import PasswordHashingBusy
+from http_client import service_client
+from metrics import init_metrics
+from tracing import init_tracing
+from health import init_health
 from config import Config
+from pagination import pagination_parser, page_model, paginate
+from serializers import serialize_with
 import os
 import jwt
+import requests
 from datetime import datetime, timedelta, timezone
-import time
-
-def wait_for_db(app, max_retries=10, delay=2):
-    with app.app_context():
-        for i in range(max_retries):
-            try:
-                db.session.execute(db.text('SELECT 1')).scalar()
-                print("Database connection successful!")
-                return
-            except Exception as e:
-                print(f"Database not ready, retrying in {delay}s... (Attempt {i+1}/{max_retries})")
-                print(f"Error: {e}")
-                time.sleep(delay)
-        raise Exception("Failed to connect to the database after multiple retries.")
-
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -44,6 +38,10 @@ api = Api(app, doc='/api-docs/', version='1.0',
               }
           })
 
+init_metrics(app, api, db)
+init_tracing(app, db)
+init_health(app, db)
+
 user_model = api.model('User', {
     'id': fields.Integer(description='User ID'),
     'username': fields.String(description='Username'),
@@ -51,6 +49,7 @@ user_model = api.model('User', {
     'role': fields.String(description='User role'),
     'balance': fields.Float(description='User balance'),
 })
+user_page_model = page_model(api, 'UserPage', user_model)
 user_input_model = api.model('UserInput', {
     'username': fields.String(required=True, description='Username'),
     'name': fields.String(description='User name'),
@@ -59,18 +58,24 @@ user_input_model = api.model('UserInput', {
 
 users_ns = api.namespace('users', description='User operations')
 
+@api.errorhandler(PasswordHashingBusy)
+def handle_password_hashing_busy(error):
+    """Shed login/signup bursts instead of letting them occupy every worker thread"""
+    return {'error': 'Authentication service is busy, please retry shortly'}, 503, {'Retry-After': '1'}
+
 @users_ns.route('/')
 class UserList(Resource):
     @users_ns.doc('list_users', security='Bearer Auth')
-    @users_ns.marshal_list_with(user_model)
+    @users_ns.expect(pagination_parser)
+    @serialize_with(users_ns, user_page_model)
     def get(self):
-        """Get all users"""
-        users = User.query.all() 
-        return [user.to_dict() for user in users]
+        """List users, one keyset page at a time"""
+        args = pagination_parser.parse_args()
+        return paginate(User.query, User, args['limit'], args['after'])
 
     @users_ns.doc('create_user', security='Bearer Auth')
     @users_ns.expect(user_input_model)
-    @users_ns.marshal_with(user_model, code=201)
+    @serialize_with(users_ns, user_model, code=201)
     def post(self):
         """Create a new user (Provider endpoint)"""
         data = request.get_json()
@@ -87,24 +92,24 @@ class UserList(Resource):
         db.session.add(user)
         db.session.commit()
         
-        return user.to_dict(), 201
+        return user, 201
 
 @users_ns.route('/<int:id>')
 @users_ns.response(404, 'User not found')
 @users_ns.param('id', 'The user identifier')
 class UserResource(Resource):
     @users_ns.doc('get_user', security='Bearer Auth')
-    @users_ns.marshal_with(user_model)
+    @serialize_with(users_ns, user_model)
     def get(self, id):
         """Get user by ID"""
         user = User.query.get(id)
         if not user:
             return {'error': 'User not found'}, 404
-        return user.to_dict()
+        return user
 
     @users_ns.doc('update_user', security='Bearer Auth')
     @users_ns.expect(user_input_model)
-    @users_ns.marshal_with(user_model)
+    @serialize_with(users_ns, user_model)
     def put(self, id):
         """Update user by ID"""
         user = User.query.get(id)
@@ -126,7 +131,7 @@ class UserResource(Resource):
             user.set_password(data['password'])
 
         db.session.commit()
-        return user.to_dict()
+        return user
 
     @users_ns.doc('delete_user', security='Bearer Auth')
     @users_ns.response(200, 'User deleted successfully')
@@ -136,8 +141,14 @@ class UserResource(Resource):
         if not user:
             return {'error': 'User not found'}, 404
 
+        delete_entries(id)
         db.session.delete(user)
         db.session.commit()
+
+        try:
+            service_client.delete(f"{Config.ORDER_SERVICE_URL}/internal/users/{id}/cache")
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: failed to invalidate Order Service user cache for user {id}: {str(e)}")
         return {'message': 'User deleted successfully'}, 200
 
 auth_ns = api.namespace('auth', description='Authentication operations')
@@ -271,16 +282,25 @@ def update_user_balance(user_id):
     user = User.query.get(user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    
+
     amount = float(data.get('amount', 0))
+    if amount < 0:
+        return jsonify({'error': 'Amount must not be negative'}), 400
+
+    # Single conditional UPDATE so concurrent payments can neither lose updates
+    # nor overdraw: the funds check and the write happen atomically in the DB.
+    # The ledger keeps the audit trail, and a change whose reference was already
+    # applied is a retry and is not applied again.
     if data.get('type') == 'credit':
-        user.balance += amount
+        credit(user_id, amount, data.get('reference'))
     elif data.get('type') == 'debit':
-        if user.balance < amount:
+        if not debit(user_id, amount, data.get('reference')):
+            db.session.rollback()
             return jsonify({'error': 'Insufficient balance'}), 400
-        user.balance -= amount
-    
+
     db.session.commit()
+    # The UPDATE bypassed the loaded user (synchronize_session=False); re-read the row it changed
+    db.session.refresh(user)
     return jsonify(user.to_dict())
 
 @app.route('/health')
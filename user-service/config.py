@@ -7,8 +7,27 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
     PORT = int(os.getenv('PORT', 3001))
     SERVICE_NAME = os.getenv('SERVICE_NAME', 'user-service')
     JWT_SECRET = os.getenv('JWT_SECRET', 'your-very-secret-jwt-key-change-in-production')
     ORDER_SERVICE_URL = os.getenv('ORDER_SERVICE_URL', 'http://order-service:3003')
-    BCRYPT_LOG_ROUNDS = 10
\ No newline at end of file
+    BCRYPT_LOG_ROUNDS = 10
+    BCRYPT_POOL_SIZE = int(os.getenv('BCRYPT_POOL_SIZE', 2))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 8))
+    # Always below the thread count, so bcrypt jobs can never hold every thread of a worker
+    BCRYPT_MAX_PENDING = max(1, min(int(os.getenv('BCRYPT_MAX_PENDING', GUNICORN_THREADS // 2)), GUNICORN_THREADS - 1))
+    BCRYPT_QUEUE_TIMEOUT = float(os.getenv('BCRYPT_QUEUE_TIMEOUT', 0))
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 1))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 2))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 0))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.2))
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 2))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 4))
+    TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH')
+    HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', 5))
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 1))
+    STARTUP_DB_TIMEOUT = float(os.getenv('STARTUP_DB_TIMEOUT', 120))
\ No newline at end of file
@@ -1,24 +1,38 @@
-import time
-from app import app, db, wait_for_db
+import os
+import shutil
+
+# Must be set before prometheus_client is imported so every worker writes to shared files
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from prometheus_client import multiprocess
+from migrations import run_migrations
+from app import app, db
+from health import wait_for_db
 from models import User
+from config import Config
 
 workers = 2
-worker_class = 'sync'
+# Threads let /internal/* requests proceed while login threads wait on the bcrypt pool;
+# at most BCRYPT_MAX_PENDING of them (< threads) are ever busy with bcrypt
+worker_class = 'gthread'
+threads = Config.GUNICORN_THREADS
 worker_connections = 1000
 timeout = 120
 keepalive = 5
 graceful_timeout = 30
 
 accesslog = '-'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" request_id=%({x-request-id}o)s'
 errorlog = '-'
 loglevel = 'debug'
 
 def on_starting(server):
     print("--- [Gunicorn] Running DB Initializer for User Service ---")
-    wait_for_db(app)
+    wait_for_db(app, db)
+    run_migrations(app)
     with app.app_context():
-        print("[Gunicorn] Creating all tables...")
-        db.create_all()
         print("[Gunicorn] Checking for admin user...")
         if not User.query.filter_by(username='admin').first():
             print("[Gunicorn] Admin user not found, creating one...")
@@ -34,4 +48,7 @@ def on_starting(server):
             print("[Gunicorn] Admin user created.")
         else:
             print("[Gunicorn] Admin user already exists.")
-    print("--- [Gunicorn] DB Initializer Complete ---")
\ No newline at end of file
+    print("--- [Gunicorn] DB Initializer Complete ---")
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
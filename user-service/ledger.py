@@ -0,0 +1,59 @@
+"""
+Balance ledger for the User Service.
+
+users.balance is the live balance. credit() and debit() change it with one
+conditional UPDATE (a debit only matches while the balance covers it), so
+concurrent payments neither lose updates nor overdraw, and the user's row is
+locked only from that UPDATE to the commit. Every change is also appended to
+balance_ledger in the same transaction as its audit trail; the ledger is
+never read to compute a balance.
+
+The ledger row is inserted first: ix_balance_ledger_user_id_type_reference is
+unique on (user_id, entry_type, reference), so a change repeating the
+reference of an earlier one (a payment retried after a timeout) fails that
+insert and is answered as done without being applied twice.
+"""
+from datetime import datetime
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+from models import db, User, BalanceLedger
+
+CREDIT = 'credit'
+DEBIT = 'debit'
+
+
+def _append(user_id, entry_type, amount, reference):
+    """
+    Record the entry; False when one with this reference was already recorded.
+
+    Must be the transaction's first write: a replay rolls the transaction back.
+    """
+    try:
+        db.session.execute(sa.insert(BalanceLedger.__table__).values(
+            user_id=user_id, entry_type=entry_type, amount=amount, reference=reference,
+            created_at=datetime.utcnow()))
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def credit(user_id, amount, reference=None):
+    """Add amount to the user's balance"""
+    if not _append(user_id, CREDIT, amount, reference):
+        return
+    User.query.filter(User.id == user_id).update(
+        {User.balance: User.balance + amount}, synchronize_session=False)
+
+
+def debit(user_id, amount, reference=None):
+    """Take amount from the user's balance if it covers it. Returns False on insufficient funds."""
+    if not _append(user_id, DEBIT, -amount, reference):
+        return True
+    return bool(User.query.filter(User.id == user_id, User.balance >= amount).update(
+        {User.balance: User.balance - amount}, synchronize_session=False))
+
+
+def delete_entries(user_id):
+    """Remove a deleted user's ledger entries; the caller commits"""
+    BalanceLedger.query.filter(BalanceLedger.user_id == user_id).delete(synchronize_session=False)
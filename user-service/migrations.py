@@ -0,0 +1,150 @@
+"""
+Versioned schema migrations for the User Service.
+
+Each migration runs once, in version order, inside its own transaction and is
+recorded in the schema_migrations table. Migration 1 is the baseline: it
+creates the tables db.create_all() used to create and skips any that already
+exist, so databases created before migrations existed upgrade in place.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending migrations
+"""
+import sys
+from datetime import datetime
+import sqlalchemy as sa
+from models import db
+
+MIGRATIONS = []
+
+schema_migrations = sa.Table(
+    'schema_migrations', sa.MetaData(),
+    sa.Column('version', sa.Integer, primary_key=True),
+    sa.Column('description', sa.String(255), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def create_index_if_missing(conn, table, name, *columns, unique=False):
+    """Create an index unless one already leads with its columns (e.g. MySQL's FK index)"""
+    for existing in sa.inspect(conn).get_indexes(table):
+        if existing['name'] == name or existing['column_names'][:len(columns)] == list(columns):
+            return
+    target = sa.Table(table, sa.MetaData(), *(sa.Column(column) for column in columns))
+    sa.Index(name, *(target.c[column] for column in columns), unique=unique).create(conn)
+
+
+# Every migration declares the tables it creates as they were at that version,
+# never through models.py, so replaying history always yields the same schema.
+
+@migration(1, 'baseline: user table')
+def baseline(conn):
+    metadata = sa.MetaData()
+    sa.Table(
+        'user', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('username', sa.String(120), unique=True, nullable=False),
+        sa.Column('name', sa.String(100)),
+        sa.Column('password_hash', sa.String(256), nullable=False),
+        sa.Column('role', sa.String(20), nullable=False),
+        sa.Column('balance', sa.Float),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, 'balance ledger and snapshot tables')
+def balance_ledger(conn):
+    # users.balance stays as each user's opening balance; no backfill needed
+    metadata = sa.MetaData()
+    sa.Table(
+        'balance_ledger', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, nullable=False),
+        sa.Column('entry_type', sa.String(10), nullable=False),
+        sa.Column('amount', sa.Float, nullable=False),
+        sa.Column('reference', sa.String(100)),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Index('ix_balance_ledger_user_id_id', 'user_id', 'id')
+    )
+    sa.Table(
+        'balance_snapshot', metadata,
+        sa.Column('user_id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('balance', sa.Float, nullable=False),
+        sa.Column('ledger_id', sa.Integer, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+@migration(3, 'balance_ledger (user_id, reference) index for debit replays')
+def ledger_reference_index(conn):
+    create_index_if_missing(conn, 'balance_ledger', 'ix_balance_ledger_user_id_reference', 'user_id', 'reference')
+
+
+@migration(4, 'fold balance snapshots into users.balance; unique ledger references')
+def balance_in_users(conn):
+    users = sa.table('user', sa.column('id'), sa.column('balance'))
+    ledger = sa.table('balance_ledger', sa.column('id'), sa.column('user_id'), sa.column('amount'))
+    snapshot = sa.table('balance_snapshot', sa.column('user_id'), sa.column('balance'), sa.column('ledger_id'))
+    # Since migration 2 users.balance was the opening balance; the live balance was the
+    # snapshot (or that opening balance) plus the ledger entries after the snapshot
+    snapshot_balance = sa.select(snapshot.c.balance).where(snapshot.c.user_id == users.c.id).scalar_subquery()
+    snapshot_ledger_id = sa.select(snapshot.c.ledger_id).where(snapshot.c.user_id == users.c.id).scalar_subquery()
+    tail = (sa.select(sa.func.coalesce(sa.func.sum(ledger.c.amount), 0))
+            .where(ledger.c.user_id == users.c.id, ledger.c.id > sa.func.coalesce(snapshot_ledger_id, 0))
+            .scalar_subquery())
+    conn.execute(sa.update(users).values(balance=sa.func.coalesce(snapshot_balance, users.c.balance) + tail))
+    sa.Table('balance_snapshot', sa.MetaData()).drop(conn, checkfirst=True)
+
+    if any(index['name'] == 'ix_balance_ledger_user_id_reference'
+           for index in sa.inspect(conn).get_indexes('balance_ledger')):
+        target = sa.Table('balance_ledger', sa.MetaData(), sa.Column('user_id'), sa.Column('reference'))
+        sa.Index('ix_balance_ledger_user_id_reference', target.c.user_id, target.c.reference).drop(conn)
+    create_index_if_missing(conn, 'balance_ledger', 'ix_balance_ledger_user_id_type_reference',
+                            'user_id', 'entry_type', 'reference', unique=True)
+
+
+def applied_versions(conn):
+    schema_migrations.create(conn, checkfirst=True)
+    return {row.version for row in conn.execute(sa.select(schema_migrations.c.version))}
+
+
+def run_migrations(app):
+    """Apply pending migrations; a single version lookup when the schema is current"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            print(f"[Migrations] Applying {version}: {description}")
+            with db.engine.begin() as conn:
+                fn(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+
+
+def print_status(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            applied = applied_versions(conn)
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{'applied' if version in applied else 'pending':<8} {version:>3}  {description}")
+
+
+if __name__ == '__main__':
+    from app import app
+    if '--status' in sys.argv:
+        print_status(app)
+    else:
+        run_migrations(app)
@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from password_hashing import hash_password, verify_password
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 
 class User(db.Model):
@@ -16,10 +18,10 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     def to_dict(self):
         return {
@@ -30,4 +32,18 @@ class User(db.Model):
             'balance': self.balance,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class BalanceLedger(db.Model):
+    """Audit trail of every credit and debit (amount is signed), written by ledger.py"""
+    __table_args__ = (
+        db.Index('ix_balance_ledger_user_id_id', 'user_id', 'id'),
+        db.Index('ix_balance_ledger_user_id_type_reference', 'user_id', 'entry_type', 'reference', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    entry_type = db.Column(db.String(10), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    reference = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
\ No newline at end of file
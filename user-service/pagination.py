@@ -0,0 +1,31 @@
+from flask_restx import reqparse, fields
+from config import Config
+
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('limit', type=int, location='args',
+                               help=f'Page size (default {Config.PAGE_SIZE_DEFAULT}, max {Config.PAGE_SIZE_MAX})')
+pagination_parser.add_argument('after', type=int, location='args',
+                               help='Cursor from a previous page: only return rows with id greater than this')
+
+
+def page_model(api, name, item_model):
+    """Swagger model for a keyset page: {'items': [...], 'next_cursor': int|null}"""
+    return api.model(name, {
+        'items': fields.List(fields.Nested(item_model)),
+        'next_cursor': fields.Integer(description='Pass as ?after= to fetch the next page; null on the last page')
+    })
+
+
+def paginate(query, model, limit=None, after=None):
+    """Keyset-paginate a query on model.id so each page costs one bounded SELECT"""
+    limit = min(max(limit or Config.PAGE_SIZE_DEFAULT, 1), Config.PAGE_SIZE_MAX)
+    if after is not None:
+        query = query.filter(model.id > after)
+
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'items': rows,
+        'next_cursor': rows[-1].id if has_more else None
+    }
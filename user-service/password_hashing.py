@@ -0,0 +1,60 @@
+import os
+import hmac
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from config import Config
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when BCRYPT_MAX_PENDING hash/verify jobs are already in flight"""
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(Config.BCRYPT_MAX_PENDING)
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _verify(pw_hash, password):
+    pw_hash = pw_hash.encode('utf-8')
+    return hmac.compare_digest(bcrypt.hashpw(password.encode('utf-8'), pw_hash), pw_hash)
+
+
+def _get_pool():
+    """Create the pool lazily per process, so gunicorn workers don't inherit the master's"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # spawn, not fork: forking a threaded gunicorn worker can copy held locks
+            _pool = ProcessPoolExecutor(max_workers=Config.BCRYPT_POOL_SIZE,
+                                        mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _run(fn, *args):
+    """Run fn in the bcrypt process pool, shedding load once BCRYPT_MAX_PENDING jobs are in flight"""
+    if Config.BCRYPT_POOL_SIZE <= 0:
+        return fn(*args)
+    if not _slots.acquire(timeout=Config.BCRYPT_QUEUE_TIMEOUT):
+        raise PasswordHashingBusy('Too many password hashing jobs in flight')
+    try:
+        return _get_pool().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    if not password:
+        raise ValueError('Password must be non-empty.')
+    return _run(_hash, password, Config.BCRYPT_LOG_ROUNDS)
+
+
+def verify_password(pw_hash, password):
+    return _run(_verify, pw_hash, password)